@@ -0,0 +1,137 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+from lazy_imports import lazy_import
+
+# --- PRE-BINNED DATASET AGGREGATES ---
+# The insights charts plot the real dataset, but never its rows: one pass
+# over the columns bins every patient into an age x systolic-BP grid per
+# cardio class and counts the classes. The result is a few KB, saved per
+# dataset version under .cache/aggregates/, so charts render in constant
+# time however many rows the data grows to.
+
+DEFAULT_CSV_PATH = "cardio_train.csv"
+DEFAULT_CACHE_DIR = os.path.join(".cache", "aggregates")
+AGGREGATES_VERSION = 1
+
+# Fixed edges keep the grid (and so the chart payload) the same size for any
+# data version; they span the ranges the assessment form accepts
+AGE_EDGES = tuple(range(25, 71, 1))  # years
+AP_HI_EDGES = tuple(range(80, 225, 5))  # mmHg
+CLASS_LABELS = ("Healthy", "Heart Disease")
+
+# app.py imports this module at startup; numpy loads with the first chart
+np = lazy_import("numpy")
+
+
+class Aggregates:
+    """Binned counts for one dataset version"""
+
+    def __init__(self, version, density, class_counts, age_edges, ap_hi_edges, rows):
+        self.version = version
+        self.density = density  # (class, age bin, ap_hi bin)
+        self.class_counts = class_counts
+        self.age_edges = age_edges
+        self.ap_hi_edges = ap_hi_edges
+        self.rows = int(rows)
+
+    @property
+    def binned_rows(self):
+        return int(self.density.sum())
+
+    def disease_rate(self, min_count=1):
+        """Share of cardio=1 per cell, NaN where fewer than `min_count` patients fall"""
+        total = self.density.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate = self.density[1] / total
+        rate[total < min_count] = np.nan
+        return rate, total
+
+
+def compute(ds):
+    """Bin a ColumnarDataset in one vectorized pass"""
+    # The shared store already carries age in years
+    age_years = np.asarray(ds['age_y']) if 'age_y' in ds else np.asarray(ds['age']) // 365
+    ap_hi = np.asarray(ds['ap_hi'])
+    cardio = np.asarray(ds['cardio']).astype(np.intp)
+
+    age_edges, ap_hi_edges = np.array(AGE_EDGES), np.array(AP_HI_EDGES)
+    n_age, n_bp = len(age_edges) - 1, len(ap_hi_edges) - 1
+    a = np.searchsorted(age_edges, age_years, side="right") - 1
+    b = np.searchsorted(ap_hi_edges, ap_hi, side="right") - 1
+    # Implausible readings (negative or five-digit BP) fall outside the grid
+    inside = (a >= 0) & (a < n_age) & (b >= 0) & (b < n_bp)
+    cell = (cardio[inside] * n_age + a[inside]) * n_bp + b[inside]
+    density = np.bincount(cell, minlength=2 * n_age * n_bp).reshape(2, n_age, n_bp).astype(np.int32)
+    class_counts = np.bincount(cardio, minlength=2).astype(np.int64)
+    return Aggregates(ds.version, density, class_counts, age_edges, ap_hi_edges, len(cardio))
+
+
+def _cache_path(version, cache_dir):
+    return os.path.join(cache_dir, f"{version}-v{AGGREGATES_VERSION}.npz")
+
+
+def _save(agg, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, density=agg.density, class_counts=agg.class_counts, age_edges=agg.age_edges,
+             ap_hi_edges=agg.ap_hi_edges, rows=np.int64(agg.rows))
+    os.replace(tmp_path, path)
+
+
+def _load(version, path):
+    with np.load(path, allow_pickle=False) as f:
+        return Aggregates(version, f['density'], f['class_counts'], f['age_edges'], f['ap_hi_edges'],
+                          f['rows'])
+
+
+_cached = {}
+_lock = threading.Lock()
+
+
+def get_aggregates(csv_path=DEFAULT_CSV_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """Aggregates for the current version of `csv_path`, computed at most once per version"""
+    from dataset_cache import load_dataset
+
+    ds = load_dataset(csv_path)
+    key = (os.path.abspath(csv_path), ds.version)
+    agg = _cached.get(key)
+    if agg is not None:
+        return agg
+    with _lock:
+        agg = _cached.get(key)
+        if agg is None:
+            path = _cache_path(ds.version, cache_dir)
+            if os.path.exists(path):
+                agg = _load(ds.version, path)
+            else:
+                agg = compute(ds)
+                _save(agg, path)
+            _cached[key] = agg
+    return agg
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the insights chart aggregates")
+    parser.add_argument("--data", default=DEFAULT_CSV_PATH)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    from dataset_cache import load_dataset
+
+    ds = load_dataset(args.data)
+    start = time.perf_counter()
+    agg = compute(ds)
+    seconds = time.perf_counter() - start
+    path = _cache_path(ds.version, args.cache_dir)
+    _save(agg, path)
+    print(f"Binned {agg.binned_rows:,} of {agg.rows:,} rows into {agg.density.shape[1]}x{agg.density.shape[2]} "
+          f"cells per class in {seconds * 1000:.1f} ms -> {path} ({os.path.getsize(path):,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,21 @@
 import streamlit as st
-import time
-import random
-import pandas as pd
-import numpy as np
-import pickle # Added for potential future model loading
+from functools import partial
+from inference import run_assessment
+from assets import stylesheet_tag
+from aggregates import CLASS_LABELS, get_aggregates
+from benchmark_models import algo_table
+from figure_cache import cached_figure, version_of
+from lazy_imports import lazy_import
+from render_timing import begin_rerun, current, finish_rerun, section, timed
+
+# Heavy libraries load on first use, so pages that draw no charts never pay for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
 
 # Try to import plotly
 try:
-    import plotly.graph_objects as go
-    import plotly.express as px
+    go = lazy_import("plotly.graph_objects")
+    px = lazy_import("plotly.express")
     PLOTLY_AVAILABLE = True
 except ImportError:
     PLOTLY_AVAILABLE = False
@@ -26,452 +33,11 @@ st.set_page_config(
 # -----------------------------------------------------------------------------
 # CUSTOM CSS & ASSETS
 # -----------------------------------------------------------------------------
+@timed
 def load_css():
-    st.markdown("""
-        <style>
-        /* IMPORT FONTS */
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=Poppins:wght@400;500;600;700;800&display=swap');
-
-        /* ROOT VARIABLES */
-        :root {
-            --primary-color: #2563eb;
-            --secondary-color: #3b82f6;
-            --accent-color: #0ea5e9;
-            --success-color: #10b981;
-            --danger-color: #ef4444;
-            --background-color: #f8fafc;
-            --card-bg: #ffffff;
-            --text-primary: #1e293b;
-            --text-secondary: #64748b;
-        }
-
-        /* GLOBAL STYLES */
-        html, body, [class*="css"] {
-            font-family: 'Inter', sans-serif;
-            background: linear-gradient(to bottom right, #f8fafc, #e0f2fe) fixed; /* Premium Medical Gradient */
-            color: var(--text-primary);
-            scroll-behavior: smooth;
-        }
-
-        /* REMOVE DEFAULT STREAMLIT PADDING */
-        .block-container {
-            padding-top: 2rem !important;
-            padding-bottom: 3rem !important;
-            max-width: 1200px !important;
-        }
-        
-        /* HIDE DEFAULT HEADER/FOOTER */
-        header {visibility: hidden;}
-        footer {visibility: hidden;}
-        #MainMenu {visibility: hidden;}
-
-        /* --- EYE-CATCHY NAVBAR STYLES --- */
-        .navbar-container {
-            position: sticky;
-            top: 0;
-            z-index: 999;
-            background: rgba(255, 255, 255, 0.8);
-            backdrop-filter: blur(25px) saturate(200%);
-            -webkit-backdrop-filter: blur(25px) saturate(200%);
-            border-bottom: 1px solid rgba(255, 255, 255, 0.6);
-            padding: 1rem 0;
-            margin-bottom: 3rem;
-            box-shadow: 0 10px 40px -10px rgba(0, 0, 0, 0.05);
-            transition: all 0.5s ease;
-        }
-
-        /* BRANDING - GRADIENT TEXT */
-        .brand-text {
-            font-family: 'Poppins', sans-serif;
-            font-weight: 900;
-            font-size: 1.8rem;
-            background: linear-gradient(135deg, #2563eb 0%, #3b82f6 50%, #0ea5e9 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            text-decoration: none;
-            display: flex;
-            align-items: center;
-            gap: 12px;
-            letter-spacing: -0.5px;
-            text-shadow: 0px 2px 10px rgba(37, 99, 235, 0.1);
-        }
-        
-        .brand-icon {
-            background: linear-gradient(135deg, #2563eb, #0ea5e9);
-            color: white;
-            width: 42px;
-            height: 42px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            border-radius: 12px;
-            font-size: 1.4rem;
-            box-shadow: 0 8px 16px -4px rgba(37, 99, 235, 0.4);
-            transform: rotate(-5deg);
-        }
-
-        /* NAV BUTTONS */
-        div.stButton > button {
-            background-color: transparent !important;
-            color: #475569 !important;
-            border: none;
-            font-weight: 600;
-            font-size: 1rem;
-            padding: 0.6rem 1.2rem;
-            border-radius: 50px;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            box-shadow: none !important;
-            font-family: 'Inter', sans-serif;
-        }
-
-        div.stButton > button:hover {
-            color: #2563eb !important;
-            background-color: rgba(37, 99, 235, 0.08) !important;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(37, 99, 235, 0.1) !important;
-        }
-        
-        div.stButton > button:active {
-            transform: scale(0.96);
-        }
-
-        /* CTA BUTTON IN NAVBAR - GLOW EFFECT */
-        .nav-cta div.stButton > button {
-            background: linear-gradient(90deg, #2563eb, #3b82f6) !important;
-            color: white !important;
-            padding: 0.7rem 1.8rem !important;
-            border-radius: 50px !important;
-            box-shadow: 0 4px 15px rgba(37, 99, 235, 0.3) !important;
-            border: 1px solid rgba(255,255,255,0.2) !important;
-        }
-        
-        .nav-cta div.stButton > button:hover {
-            background: linear-gradient(90deg, #1d4ed8, #2563eb) !important;
-            transform: translateY(-2px) scale(1.02);
-            box-shadow: 0 8px 25px rgba(37, 99, 235, 0.5) !important;
-        }
-
-        /* HERO SECTION REDESIGNED */
-        .hero-section {
-            padding: 4rem 1rem;
-            position: relative;
-            overflow: visible;
-        }
-        
-        @keyframes gradient-animation {
-            0% { background-position: 0% 50%; }
-            50% { background-position: 100% 50%; }
-            100% { background-position: 0% 50%; }
-        }
-        
-        .hero-badge {
-            display: inline-block;
-            background: rgba(37, 99, 235, 0.1);
-            color: var(--primary-color);
-            padding: 0.5rem 1rem;
-            border-radius: 50px;
-            font-size: 0.85rem;
-            font-weight: 600;
-            margin-bottom: 1.5rem;
-            border: 1px solid rgba(37, 99, 235, 0.2);
-        }
-
-        .hero-title {
-            font-family: 'Poppins', sans-serif;
-            font-weight: 800;
-            font-size: 4rem;
-            line-height: 1.1;
-            margin-bottom: 1.5rem;
-            background: linear-gradient(135deg, #0f172a 0%, #3b82f6 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            letter-spacing: -2px;
-        }
-
-        .hero-desc {
-            font-size: 1.2rem;
-            color: var(--text-secondary);
-            line-height: 1.8;
-            margin-bottom: 2.5rem;
-            max-width: 90%;
-        }
-
-        /* FLOATING VISUAL ANIMATION */
-        @keyframes float {
-            0% { transform: translateY(0px); }
-            50% { transform: translateY(-20px); }
-            100% { transform: translateY(0px); }
-        }
-
-        .visual-container {
-            position: relative;
-            height: 400px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            animation: float 6s ease-in-out infinite;
-        }
-        
-        .glass-circle {
-            position: absolute;
-            background: rgba(255, 255, 255, 0.1);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255, 255, 255, 0.5);
-            border-radius: 50%;
-            z-index: 0;
-        }
-
-        /* FEATURE CARDS IMPROVED */
-        .feature-card-p {
-            background: white;
-            padding: 2.5rem;
-            border-radius: 1.5rem;
-            border: 1px solid #f1f5f9;
-            text-align: left;
-            transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-            position: relative;
-            overflow: hidden;
-            height: 100%;
-        }
-        
-        .feature-card-p::before {
-            content: '';
-            position: absolute;
-            top: 0; left: 0; width: 4px; height: 100%;
-            background: var(--primary-color);
-            opacity: 0;
-            transition: opacity 0.3s;
-        }
-        
-        .feature-card-p:hover {
-            transform: translateY(-10px);
-            box-shadow: 0 20px 40px -10px rgba(0,0,0,0.08);
-            border-color: rgba(37, 99, 235, 0.2);
-        }
-        
-        .feature-card-p:hover::before {
-            opacity: 1;
-        }
-        
-        .feature-icon-box {
-            width: 60px;
-            height: 60px;
-            background: #eff6ff;
-            border-radius: 12px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 1.8rem;
-            color: var(--primary-color);
-            margin-bottom: 1.5rem;
-            transition: transform 0.3s;
-        }
-        
-        .feature-card-p:hover .feature-icon-box {
-            transform: rotate(10deg) scale(1.1);
-            background: var(--primary-color);
-            color: white;
-        }
-
-        /* PRIMARY ACTION BUTTON */
-        .primary-btn-container div.stButton > button {
-            background: linear-gradient(135deg, #2563eb 0%, #3b82f6 100%) !important;
-            color: white !important;
-            font-weight: 600 !important;
-            padding: 0.8rem 2.5rem !important;
-            border-radius: 50px !important;
-            box-shadow: 0 10px 25px -5px rgba(37, 99, 235, 0.4) !important;
-            font-size: 1.1rem !important;
-        }
-        
-        .primary-btn-container div.stButton > button:hover {
-            transform: translateY(-2px) !important;
-            box-shadow: 0 15px 30px -5px rgba(37, 99, 235, 0.5) !important;
-        }
-
-        /* FORM STYLING */
-        .section-header {
-            font-family: 'Poppins', sans-serif;
-            font-size: 1.8rem;
-            font-weight: 700;
-            color: var(--text-primary);
-            margin-bottom: 2rem;
-            display: flex;
-            align-items: center;
-            gap: 1rem;
-        }
-        
-        .section-header::before {
-            content: '';
-            display: block;
-            width: 6px;
-            height: 32px;
-            background: var(--primary-color);
-            border-radius: 4px;
-        }
-        
-        /* NEW PREDICT PAGE STYLES */
-        .form-subtitle {
-            font-size: 0.9rem;
-            font-weight: 600;
-            color: #64748b;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            margin-bottom: 1rem;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-        
-        .form-section-box {
-            background: #f8fafc;
-            border-radius: 1rem;
-            padding: 1.5rem;
-            border: 1px solid #e2e8f0;
-            height: 100%;
-        }
-
-        .form-card {
-            background: white;
-            padding: 3rem;
-            border-radius: 2rem;
-            box-shadow: 0 10px 40px -10px rgba(0, 0, 0, 0.05);
-            border: 1px solid #f1f5f9;
-        }
-
-        /* INPUT FIELDS */
-        .stNumberInput input, .stSelectbox div[data-baseweb="select"] {
-            border-radius: 12px;
-            border-color: #cbd5e1; /* slightly darker for better visibility */
-            padding: 0.5rem;
-            background: white;
-        }
-        
-        .stNumberInput input:focus, .stSelectbox div[data-baseweb="select"]:focus-within {
-            border-color: var(--primary-color);
-            box-shadow: 0 0 0 4px rgba(37, 99, 235, 0.1);
-        }
-
-        /* RESULT CARDS - ENHANCED */
-        .result-container {
-            background: white;
-            border-radius: 2rem;
-            box-shadow: 0 20px 50px -10px rgba(0,0,0,0.1);
-            overflow: hidden;
-            animation: fadeIn 1s ease;
-        }
-        
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(20px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-        
-        .factor-card {
-            background: #f1f5f9;
-            padding: 1rem;
-            border-radius: 1rem;
-            margin-bottom: 0.5rem;
-            border-left: 4px solid var(--primary-color);
-        }
-        
-        .factor-warning {
-             border-left-color: #ef4444;
-             background: #fef2f2;
-        }
-
-        /* CAUTION PAGE STYLES */
-        @keyframes pulse-red {
-            0% { box-shadow: 0 0 0 0 rgba(239, 68, 68, 0.4); }
-            70% { box-shadow: 0 0 0 20px rgba(239, 68, 68, 0); }
-            100% { box-shadow: 0 0 0 0 rgba(239, 68, 68, 0); }
-        }
-        
-        .emergency-banner {
-            background: linear-gradient(135deg, #fee2e2 0%, #fef2f2 100%);
-            border: 2px solid #ef4444;
-            border-radius: 1.5rem;
-            padding: 3rem;
-            text-align: center;
-            animation: pulse-red 2s infinite;
-            margin-bottom: 3rem;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .emergency-banner::before {
-            content: '⚠️';
-            position: absolute;
-            font-size: 15rem;
-            opacity: 0.05;
-            top: 50%; left: 50%;
-            transform: translate(-50%, -50%);
-            pointer-events: none;
-        }
-
-        .symptom-card {
-            background: white;
-            padding: 2rem;
-            border-radius: 1rem;
-            border-left: 5px solid #ef4444;
-            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.05);
-            transition: transform 0.3s ease;
-            height: 100%;
-        }
-        
-        .symptom-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1);
-        }
-
-        .limitations-section {
-            background: #f8fafc;
-            border-radius: 2rem;
-            padding: 3rem;
-            border: 1px solid #e2e8f0;
-        }
-
-        /* ABOUT SECTION */
-        .about-card {
-            background: white;
-            padding: 2.5rem;
-            border-radius: 1.5rem;
-            border: 1px solid #f1f5f9;
-            height: 100%;
-            transition: all 0.3s ease;
-        }
-        
-        .about-card:hover {
-            box-shadow: 0 15px 30px -5px rgba(0,0,0,0.05);
-            transform: translateY(-5px);
-        }
-        
-        .about-icon {
-            font-size: 2.5rem;
-            margin-bottom: 1.5rem;
-            display: inline-block;
-            padding: 1rem;
-            background: #f8fafc;
-            border-radius: 1rem;
-        }
-
-        /* FOOTER */
-        .footer {
-            margin-top: 6rem;
-            padding: 4rem 0 2rem 0;
-            border-top: 1px solid #f1f5f9;
-            text-align: center;
-        }
-        
-        .footer-brand {
-            font-family: 'Poppins', sans-serif;
-            font-weight: 700;
-            font-size: 1.5rem;
-            color: #cbd5e1;
-            margin-bottom: 1rem;
-        }
-
-        </style>
-    """, unsafe_allow_html=True)
+    # Minified, content-hashed stylesheet served from static/ (see assets.py);
+    # only the <link> tag is sent per rerun
+    st.markdown(stylesheet_tag("app"), unsafe_allow_html=True)
 
 # -----------------------------------------------------------------------------
 # SESSION STATE MANAGEMENT
@@ -486,6 +52,7 @@ def navigate_to(page):
 # COMPONENTS
 # -----------------------------------------------------------------------------
 
+@timed
 def render_navbar():
     st.markdown('<div class="navbar-container">', unsafe_allow_html=True)
     
@@ -513,6 +80,7 @@ def render_navbar():
             
     st.markdown('</div>', unsafe_allow_html=True)
 
+@timed
 def render_hero():
     # Split Layout Hero with Animation
     c1, c2 = st.columns([1.2, 1], gap="large")
@@ -549,71 +117,7 @@ def render_hero():
             </div>
         """, unsafe_allow_html=True)
 
-def mock_predict(data):
-    """
-    Mock prediction logic updated for CardioTrain features.
-    """
-    time.sleep(1.0) 
-    
-    score = 0
-    factors = []
-    
-    # 1. Age (in years)
-    if data['age'] > 50: 
-        score += 15
-        factors.append("Age > 50")
-    
-    # 2. Gender (1=Female, 2=Male) - assuming Male has slightly higher baseline risk in this simplified model
-    if data['gender'] == 2: 
-        score += 5
-
-    # 3. BMI Calculation for Height/Weight Risk
-    # Height in cm, Weight in kg
-    bmi = data['weight'] / ((data['height'] / 100) ** 2)
-    if bmi > 30:
-        score += 15
-        factors.append(f"Obesity (BMI {bmi:.1f})")
-    elif bmi > 25:
-        score += 5
-        
-    # 4. Blood Pressure (Systolic/Diastolic)
-    # Systolic > 140 or Diastolic > 90
-    if data['ap_hi'] > 140 or data['ap_lo'] > 90:
-        score += 20
-        factors.append("Hypertension")
-    
-    # 5. Cholesterol (1:Normal, 2:Above Normal, 3:Well Above)
-    if data['cholesterol'] == 3:
-        score += 25
-        factors.append("Critically High Cholesterol")
-    elif data['cholesterol'] == 2:
-        score += 10
-        factors.append("Elevated Cholesterol")
-        
-    # 6. Glucose
-    if data['gluc'] > 1:
-        score += 10
-        factors.append("Elevated Glucose")
-        
-    # 7. Lifestyle
-    if data['smoke'] == 1:
-        score += 10
-        factors.append("Smoker")
-    
-    if data['alco'] == 1:
-        score += 5
-        
-    if data['active'] == 0:
-        score += 10
-        factors.append("Sedentary Lifestyle")
-    
-    # Normalize score
-    base_prob = min(score / 100.0, 0.95)
-    final_prob = base_prob + random.uniform(-0.02, 0.02)
-    final_prob = min(max(final_prob, 0.02), 0.98)
-    
-    return final_prob, factors
-
+@timed
 def render_prediction_form():
     st.markdown('<div class="section-header">Medical Assessment Protocol</div>', unsafe_allow_html=True)
     
@@ -692,19 +196,16 @@ def render_prediction_form():
                     "active": active_val
                 }
                 
-                # SIMULATED PROCESSING ANIMATION
-                progress_text = "Analyzing Bio-markers..."
-                my_bar = st.progress(0, text=progress_text)
-                
-                for percent_complete in range(100):
-                    time.sleep(0.012)
-                    my_bar.progress(percent_complete + 1, text="Analyzing Vitals & generating risk profile...")
-                
-                # Final calculation
-                prob, factors = mock_predict(data)
+                # REAL INFERENCE - progress advances as each stage runs
+                my_bar = st.progress(0, text="Analyzing Bio-markers...")
+                result = run_assessment(
+                    data,
+                    progress=lambda fraction, text: my_bar.progress(int(fraction * 100), text=text)
+                )
                 
-                st.session_state.last_prediction = prob
-                st.session_state.last_factors = factors
+                st.session_state.last_prediction = result['probability']
+                st.session_state.last_factors = result['factors']
+                st.session_state.last_latency = (result['latency_ms'], result['budget_ms'])
                 my_bar.empty()
                 
             st.markdown('</div>', unsafe_allow_html=True)
@@ -720,31 +221,32 @@ def render_prediction_form():
         # GAUGE CHART RESULT
         mid_color = "#ef4444" if prob > 0.5 else "#10b981"
         
-        fig_gauge = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = percentage,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "Cardiovascular Risk Probability", 'font': {'size': 24, 'color': "#1e293b"}},
-            number = {'suffix': "%", 'font': {'size': 50, 'color': mid_color, 'family': "Poppins"}},
-            gauge = {
-                'axis': {'range': [None, 100], 'tickwidth': 1, 'tickcolor': "#cbd5e1"},
-                'bar': {'color': mid_color},
-                'bgcolor': "white",
-                'borderwidth': 2,
-                'bordercolor': "#cbd5e1",
-                'steps': [
-                    {'range': [0, 40], 'color': '#ecfdf5'},
-                    {'range': [40, 70], 'color': '#fff7ed'},
-                    {'range': [70, 100], 'color': '#fef2f2'}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 90
+        with section("figure.gauge"):
+            fig_gauge = go.Figure(go.Indicator(
+                mode = "gauge+number",
+                value = percentage,
+                domain = {'x': [0, 1], 'y': [0, 1]},
+                title = {'text': "Cardiovascular Risk Probability", 'font': {'size': 24, 'color': "#1e293b"}},
+                number = {'suffix': "%", 'font': {'size': 50, 'color': mid_color, 'family': "Poppins"}},
+                gauge = {
+                    'axis': {'range': [None, 100], 'tickwidth': 1, 'tickcolor': "#cbd5e1"},
+                    'bar': {'color': mid_color},
+                    'bgcolor': "white",
+                    'borderwidth': 2,
+                    'bordercolor': "#cbd5e1",
+                    'steps': [
+                        {'range': [0, 40], 'color': '#ecfdf5'},
+                        {'range': [40, 70], 'color': '#fff7ed'},
+                        {'range': [70, 100], 'color': '#fef2f2'}
+                    ],
+                    'threshold': {
+                        'line': {'color': "red", 'width': 4},
+                        'thickness': 0.75,
+                        'value': 90
+                    }
                 }
-            }
-        ))
-        fig_gauge.update_layout(height=400, margin=dict(l=20, r=20, t=50, b=20), paper_bgcolor='rgba(0,0,0,0)', font={'family': "Inter"})
+            ))
+            fig_gauge.update_layout(height=400, margin=dict(l=20, r=20, t=50, b=20), paper_bgcolor='rgba(0,0,0,0)', font={'family': "Inter"})
         
         c_res1, c_res2 = st.columns([1.5, 1], gap="large")
         
@@ -761,6 +263,9 @@ def render_prediction_form():
                     </p>
                 </div>
             """, unsafe_allow_html=True)
+            if 'last_latency' in st.session_state:
+                latency_ms, budget_ms = st.session_state.last_latency
+                st.caption(f"⚡ Risk profile computed in {latency_ms:.2f} ms (budget {budget_ms:.0f} ms)")
             st.markdown('</div>', unsafe_allow_html=True)
             
         with c_res2:
@@ -792,6 +297,110 @@ def render_prediction_form():
                 </div>
             """, unsafe_allow_html=True)
 
+# Figure builders for render_insights. Each runs only when its inputs
+# change; reruns get the figure from the version-keyed figure cache.
+def _feature_importance_figure():
+    # Updated to match CardioTrain importance generally (Systolic BP is usually high)
+    features = ['Systolic BP (ap_hi)', 'Age', 'Cholesterol', 'Weight', 'Diastolic BP (ap_lo)', 'Glucose', 'Physical Activity']
+    importance = [0.35, 0.20, 0.15, 0.10, 0.08, 0.07, 0.05]
+    
+    df_imp = pd.DataFrame({'Feature': features, 'Importance': importance})
+    fig_imp = px.bar(
+        df_imp, x='Importance', y='Feature', orientation='h',
+        color='Importance', color_continuous_scale='Blues'
+    )
+    fig_imp.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=400)
+    return fig_imp
+
+def _age_vs_bp_figure(agg):
+    # Pre-binned counts (aggregates.py): the figure is the same size for any row count
+    rate, total = agg.disease_rate(min_count=20)
+    age_mid = (agg.age_edges[:-1] + agg.age_edges[1:]) / 2
+    bp_mid = (agg.ap_hi_edges[:-1] + agg.ap_hi_edges[1:]) / 2
+    fig_density = go.Figure(go.Heatmap(
+        x=age_mid, y=bp_mid, z=rate.T * 100, customdata=total.T,
+        colorscale=[[0, "#10b981"], [0.5, "#fbbf24"], [1, "#ef4444"]], zmin=0, zmax=100,
+        colorbar=dict(title="% Disease", ticksuffix="%"),
+        hovertemplate="Age %{x:.0f} · Systolic BP %{y:.0f}<br>"
+                      "%{z:.0f}% with disease<br>%{customdata:,} patients<extra></extra>"
+    ))
+    fig_density.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                              xaxis_title="Age (years)", yaxis_title="Systolic BP (mmHg)")
+    return fig_density
+
+def _risk_distribution_figure(agg):
+    fig_pie = go.Figure(go.Pie(
+        labels=list(CLASS_LABELS), values=agg.class_counts.tolist(), hole=0.6, sort=False,
+        marker=dict(colors=["#3b82f6", "#ef4444"])
+    ))
+    fig_pie.update_layout(paper_bgcolor='rgba(0,0,0,0)')
+    return fig_pie
+
+def _model_comparison_figure(algo_data):
+    models = list(algo_data.keys())
+    train_scores = [algo_data[m]["Train"] for m in models]
+    test_scores = [algo_data[m]["Test"] for m in models]
+
+    fig_comp = go.Figure()
+    fig_comp.add_trace(go.Bar(
+        x=models, y=train_scores, name='Training Accuracy',
+        marker_color='#60a5fa', text=[f'{x}%' for x in train_scores], textposition='auto'
+    ))
+    fig_comp.add_trace(go.Bar(
+        x=models, y=test_scores, name='Testing Accuracy',
+        marker_color='#34d399', text=[f'{x}%' for x in test_scores], textposition='auto'
+    ))
+
+    fig_comp.update_layout(
+        barmode='group',
+        height=500,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(l=20, r=20, t=20, b=20),
+        yaxis_title="Accuracy Percentage (%)",
+        xaxis_tickangle=-15,
+        font=dict(family="Inter", size=12)
+    )
+    return fig_comp
+
+def _model_radar_figure(algo_data):
+    models = list(algo_data.keys())
+    train_scores = [algo_data[m]["Train"] for m in models]
+    test_scores = [algo_data[m]["Test"] for m in models]
+
+    fig_radar = go.Figure()
+    fig_radar.add_trace(go.Scatterpolar(
+        r=test_scores,
+        theta=models,
+        fill='toself',
+        name='Test Accuracy',
+        line_color='#ec4899'
+    ))
+    fig_radar.add_trace(go.Scatterpolar(
+        r=train_scores,
+        theta=models,
+        fill='toself',
+        name='Train Accuracy',
+        line_color='#8b5cf6'
+    ))
+
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[60, 85] 
+            )
+        ),
+        showlegend=True,
+        height=500,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Inter", size=12)
+    )
+    return fig_radar
+
+@timed
 def render_insights():
     st.markdown('<div class="section-header">Analytics & Model Insights</div>', unsafe_allow_html=True)
     
@@ -800,95 +409,54 @@ def render_insights():
         st.markdown("### 📊 Key Risk Factors Identification")
         st.write("The model identifies the following features as primarily influential in predicting heart disease.")
         
-        # Updated to match CardioTrain importance generally (Systolic BP is usually high)
-        features = ['Systolic BP (ap_hi)', 'Age', 'Cholesterol', 'Weight', 'Diastolic BP (ap_lo)', 'Glucose', 'Physical Activity']
-        importance = [0.35, 0.20, 0.15, 0.10, 0.08, 0.07, 0.05]
-        
-        df_imp = pd.DataFrame({'Feature': features, 'Importance': importance})
-        
-        fig_imp = px.bar(
-            df_imp, x='Importance', y='Feature', orientation='h',
-            color='Importance', color_continuous_scale='Blues'
-        )
-        fig_imp.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=400)
+        with section("figure.feature_importance"):
+            # Static inputs; the builder's code is part of the cache key
+            fig_imp = cached_figure("feature_importance", "static", _feature_importance_figure)
         st.plotly_chart(fig_imp, use_container_width=True)
         
         st.markdown("---")
         
-        c1, c2 = st.columns(2)
+        try:
+            with section("data.aggregates"):
+                agg = get_aggregates()
+        except FileNotFoundError:
+            agg = None
         
-        with c1:
-            st.markdown("### 📉 Age vs. Systolic BP")
-            st.write("Correlation between Age and Blood Pressure.")
-            
-            # Dummy data for scatter
-            np.random.seed(42)
-            n_samples = 200
-            age_data = np.random.randint(29, 78, n_samples)
-            bp_data = 110 + (age_data * 0.5) + np.random.randint(-20, 30, n_samples) # simple correlation
-            condition = np.random.choice(["Healthy", "Disease"], n_samples)
+        if agg is None:
+            st.info("Dataset not found. Place `cardio_train.csv` next to the app to see the dataset charts.")
+        else:
+            c1, c2 = st.columns(2)
             
-            df_scatter = pd.DataFrame({'Age': age_data, 'Systolic BP': bp_data, 'Condition': condition})
+            with c1:
+                st.markdown("### 📉 Age vs. Systolic BP")
+                st.write("Share of patients with heart disease at each age and systolic BP (cells with 20+ patients).")
             
-            fig_scatter = px.scatter(
-                df_scatter, x='Age', y='Systolic BP', color='Condition',
-                color_discrete_map={"Healthy": "#10b981", "Disease": "#ef4444"},
-                opacity=0.7
-            )
-            fig_scatter.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-            st.plotly_chart(fig_scatter, use_container_width=True)
+                with section("figure.age_vs_bp"):
+                    fig_density = cached_figure("age_vs_bp", agg.version, partial(_age_vs_bp_figure, agg))
+                st.plotly_chart(fig_density, use_container_width=True)
             
-        with c2:
-            st.markdown("### 🍩 Dataset Risk Distribution")
-            st.write("Proportion of positive cases in the training dataset.")
+            with c2:
+                st.markdown("### 🍩 Dataset Risk Distribution")
+                st.write(f"Proportion of positive cases across the {agg.rows:,} patients in the training dataset.")
             
-            df_pie = pd.DataFrame({'Label': ['Healthy', 'Heart Disease'], 'Count': [35000, 34979]}) # Approx 70k balanced
-            
-            fig_pie = px.pie(
-                df_pie, values='Count', names='Label', hole=0.6,
-                color='Label', color_discrete_map={"Healthy": "#3b82f6", "Heart Disease": "#ef4444"}
-            )
-            fig_pie.update_layout(paper_bgcolor='rgba(0,0,0,0)')
-            st.plotly_chart(fig_pie, use_container_width=True)
+                with section("figure.risk_distribution"):
+                    fig_pie = cached_figure("risk_distribution", agg.version, partial(_risk_distribution_figure, agg))
+                st.plotly_chart(fig_pie, use_container_width=True)
             
         # 4. Algorithm Comparison Graph
         st.markdown("---")
         st.markdown("### 🏆 Comprehensive Model Comparison")
         st.write("Visual benchmarking of five state-of-the-art machine learning algorithms on this dataset.")
 
-        algo_data = {
-            "Decision Tree": {"Train": 73.00, "Test": 73.45},
-            "Random Forest": {"Train": 72.76, "Test": 72.95},
-            "Logistic Regression": {"Train": 72.31, "Test": 73.13},
-            "KNN": {"Train": 81.31, "Test": 66.96},
-            "XGBoost": {"Train": 73.45, "Test": 73.48}
-        }
-        
-        models = list(algo_data.keys())
-        train_scores = [algo_data[m]["Train"] for m in models]
-        test_scores = [algo_data[m]["Test"] for m in models]
-
-        fig_comp = go.Figure()
-        fig_comp.add_trace(go.Bar(
-            x=models, y=train_scores, name='Training Accuracy',
-            marker_color='#60a5fa', text=[f'{x}%' for x in train_scores], textposition='auto'
-        ))
-        fig_comp.add_trace(go.Bar(
-            x=models, y=test_scores, name='Testing Accuracy',
-            marker_color='#34d399', text=[f'{x}%' for x in test_scores], textposition='auto'
-        ))
+        # Written by benchmark_models.py
+        algo_data = algo_table()
+        if not algo_data:
+            st.info("No benchmark results yet. Run `python benchmark_models.py` to generate them.")
+            return
+        results_version = version_of(algo_data)
 
-        fig_comp.update_layout(
-            barmode='group',
-            height=500,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            margin=dict(l=20, r=20, t=20, b=20),
-            yaxis_title="Accuracy Percentage (%)",
-            xaxis_tickangle=-15,
-            font=dict(family="Inter", size=12)
-        )
+        with section("figure.model_comparison"):
+            fig_comp = cached_figure("model_comparison", results_version, partial(_model_comparison_figure, algo_data))
         
         st.markdown('<div class="form-card">', unsafe_allow_html=True)
         st.plotly_chart(fig_comp, use_container_width=True)
@@ -899,35 +467,8 @@ def render_insights():
         st.markdown("### 🕸️ Model Capability Radar")
         st.write("Multidimensional performance comparison.")
         
-        fig_radar = go.Figure()
-        fig_radar.add_trace(go.Scatterpolar(
-            r=test_scores,
-            theta=models,
-            fill='toself',
-            name='Test Accuracy',
-            line_color='#ec4899'
-        ))
-        fig_radar.add_trace(go.Scatterpolar(
-            r=train_scores,
-            theta=models,
-            fill='toself',
-            name='Train Accuracy',
-            line_color='#8b5cf6'
-        ))
-        
-        fig_radar.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[60, 85] 
-                )
-            ),
-            showlegend=True,
-            height=500,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(family="Inter", size=12)
-        )
+        with section("figure.model_radar"):
+            fig_radar = cached_figure("model_radar", results_version, partial(_model_radar_figure, algo_data))
         st.markdown('<div class="form-card">', unsafe_allow_html=True)
         st.plotly_chart(fig_radar, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
@@ -935,6 +476,7 @@ def render_insights():
     else:
         st.warning("Plotly is not installed. Please install plotly to view advanced analytics.")
 
+@timed
 def render_caution():
     st.markdown('<div class="section-header" style="color: #ef4444;">⚠️ CAUTION: Important Safety Information</div>', unsafe_allow_html=True)
     
@@ -1006,6 +548,7 @@ def render_caution():
         </div>
     """, unsafe_allow_html=True)
 
+@timed
 def render_about():
     st.markdown('<div class="section-header">About the Model</div>', unsafe_allow_html=True)
     
@@ -1086,13 +629,11 @@ def render_about():
     st.markdown("<br><br>", unsafe_allow_html=True)
     st.markdown('<div class="section-header">Algorithm Performance Benchmarks</div>', unsafe_allow_html=True)
     
-    algo_data = {
-        "Decision Tree": {"Train": 73.00, "Test": 73.45},
-        "Random Forest": {"Train": 72.76, "Test": 72.95},
-        "Logistic Regression": {"Train": 72.31, "Test": 73.13},
-        "KNN": {"Train": 81.31, "Test": 66.96},
-        "XGBoost": {"Train": 73.45, "Test": 73.48}
-    }
+    # Written by benchmark_models.py
+    algo_data = algo_table()
+    if not algo_data:
+        st.info("No benchmark results yet. Run `python benchmark_models.py` to generate them.")
+        return
     
     cols = st.columns(len(algo_data))
     for idx, (model, scores) in enumerate(algo_data.items()):
@@ -1105,6 +646,7 @@ def render_about():
                 </div>
             """, unsafe_allow_html=True)
 
+@timed
 def render_footer():
     st.markdown("""
         <div class="footer">
@@ -1116,8 +658,14 @@ def render_footer():
 # -----------------------------------------------------------------------------
 # MAIN APP LOGIC
 # -----------------------------------------------------------------------------
+# Opt-in render timing (CARDIOCARE_TIMING=1 or ?timing=1)
+begin_rerun("app.py", page=st.session_state.page)
+
 load_css()
 render_navbar()
+# A navbar click changes the page this rerun renders; label the timings with it
+if current() is not None:
+    current().page = st.session_state.page
 
 if st.session_state.page == 'home':
     render_hero()
@@ -1171,4 +719,5 @@ elif st.session_state.page == 'caution':
 elif st.session_state.page == 'about':
     render_about()
 
-render_footer()
\ No newline at end of file
+render_footer()
+finish_rerun()
@@ -0,0 +1,251 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from string import Template
+
+# --- STATIC ASSET PIPELINE ---
+# The page stylesheets live in assets/css/. They are minified once into
+# content-hashed files under static/, which Streamlit serves at /app/static/
+# (enableStaticServing in .streamlit/config.toml), so a rerun only sends a
+# <link> tag and the browser keeps the file until its content changes.
+# Home's light and dark palettes are rendered into separate files up front.
+# Fonts are self-hosted from assets/fonts/ (see `fetch-fonts`); until they
+# are fetched, the stylesheets fall back to Streamlit's bundled Source Sans.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(HERE, "assets")
+STATIC_DIR = os.path.join(HERE, "static")
+MANIFEST_PATH = os.path.join(STATIC_DIR, "manifest.json")
+FONTS_INDEX = os.path.join(SOURCE_DIR, "fonts", "fonts.json")
+STATIC_URL = "app/static"
+PIPELINE_VERSION = 1
+
+# Palettes for assets/css/home.css (formerly inline in apply_flat_design)
+HOME_THEMES = {
+    "light": {
+        "bg_color": "#f5f5f5",  # Light gray
+        "card_bg": "#ffffff",  # White
+        "text_color": "#1a1a1a",
+        "border_color": "#d4d4d4",
+        "primary_red": "#dc2626",
+    },
+    "dark": {
+        "bg_color": "#1a1a1a",  # Deep charcoal
+        "card_bg": "#2d2d2d",
+        "text_color": "#e5e5e5",
+        "border_color": "#404040",
+        "primary_red": "#dc2626",
+    },
+}
+
+# stylesheet name -> (source file, template variables)
+STYLESHEETS = {
+    "app": ("app.css", None),
+    **{f"home.{theme}": ("home.css", palette) for theme, palette in HOME_THEMES.items()},
+}
+
+# Google Fonts families fetched by `fetch-fonts` (latin subset)
+FONT_FAMILIES = {
+    "Inter": "300;400;500;600;700",
+    "Poppins": "400;500;600;700;800",
+}
+
+
+# --- MINIFICATION ---
+_STRING_OR_COMMENT = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.S)
+
+
+def minify_css(css):
+    """Strip comments and insignificant whitespace; quoted strings are left alone"""
+    strings = []
+
+    def stash(m):
+        if m.group(1) is None:
+            return ""
+        strings.append(m.group(1))
+        return f"\0{len(strings) - 1}\0"
+
+    css = _STRING_OR_COMMENT.sub(stash, css)
+    css = re.sub(r"\s+", " ", css)
+    # Spaces before ':' are kept: in selectors they are significant (".a :hover")
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    css = css.replace(";}", "}").strip()
+    return re.sub(r"\0(\d+)\0", lambda m: strings[int(m.group(1))], css)
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_hashed(subdir, stem, ext, data):
+    name = f"{stem}.{_digest(data)[:12]}{ext}"
+    path = os.path.join(STATIC_DIR, subdir, name)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+    return f"{subdir}/{name}"
+
+
+# --- FONTS ---
+def _read_fonts_index():
+    try:
+        with open(FONTS_INDEX) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def _font_faces():
+    """Copy the self-hosted fonts to static/; returns [(family, @font-face rule)]"""
+    rules = []
+    for face in _read_fonts_index():
+        with open(os.path.join(SOURCE_DIR, "fonts", face["file"]), "rb") as f:
+            stem, ext = os.path.splitext(face["file"])
+            path = _write_hashed("fonts", stem, ext, f.read())
+        # Stylesheets live in static/css/, so fonts are one level up
+        src = f"src:local('{face['family']}'),url(../{path}) format('woff2');"
+        unicode_range = f"unicode-range:{face['unicode_range']};" if face.get("unicode_range") else ""
+        rules.append((face["family"], (
+            f"@font-face{{font-family:'{face['family']}';font-style:{face.get('style', 'normal')};"
+            f"font-weight:{face['weight']};font-display:swap;{src}{unicode_range}}}"
+        )))
+    return rules
+
+
+def fetch_fonts(families=FONT_FAMILIES, dest=os.path.join(SOURCE_DIR, "fonts")):
+    """Download the latin woff2 files for `families` once, for self-hosting"""
+    from urllib.request import Request, urlopen
+
+    query = "&".join(f"family={name.replace(' ', '+')}:wght@{weights}" for name, weights in families.items())
+    # Google only serves woff2 to browsers it recognises
+    request = Request(f"https://fonts.googleapis.com/css2?{query}&display=swap",
+                      headers={"User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0"})
+    css = urlopen(request, timeout=30).read().decode()
+
+    os.makedirs(dest, exist_ok=True)
+    faces, files = [], {}
+    for subset, block in re.findall(r"/\* ([\w-]+) \*/\s*@font-face\s*{(.*?)}", css, re.S):
+        if subset != "latin":
+            continue
+        props = dict(re.findall(r"([\w-]+):\s*([^;]+);", block))
+        url = re.search(r"url\((.*?)\)", props["src"]).group(1)
+        family = props["font-family"].strip("'\"")
+        if url not in files:
+            # Variable fonts serve every weight from one file
+            files[url] = f"{family.lower().replace(' ', '-')}-{props['font-weight'].replace(' ', '-')}.woff2"
+            with open(os.path.join(dest, files[url]), "wb") as f:
+                f.write(urlopen(url, timeout=30).read())
+        faces.append({"family": family, "style": props.get("font-style", "normal"),
+                      "weight": props["font-weight"], "file": files[url],
+                      "unicode_range": props.get("unicode-range")})
+    with open(os.path.join(dest, "fonts.json"), "w") as f:
+        json.dump(faces, f, indent=2)
+    return faces
+
+
+# --- BUILD ---
+def _sources_key():
+    """Hash of everything the built files depend on"""
+    h = hashlib.sha256(f"{PIPELINE_VERSION}{json.dumps(STYLESHEETS, sort_keys=True)}".encode())
+    paths = sorted({os.path.join(SOURCE_DIR, "css", source) for source, _ in STYLESHEETS.values()})
+    if os.path.exists(FONTS_INDEX):
+        paths.append(FONTS_INDEX)
+        paths += [os.path.join(SOURCE_DIR, "fonts", face["file"]) for face in _read_fonts_index()]
+    for path in paths:
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def read_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def build():
+    """Minify and hash every stylesheet into static/; returns the manifest"""
+    font_faces = _font_faces()
+    files = {}
+    for name, (source, variables) in STYLESHEETS.items():
+        with open(os.path.join(SOURCE_DIR, "css", source)) as f:
+            css = f.read()
+        if variables is not None:
+            css = Template(css).substitute(variables)
+        # Only the faces this stylesheet actually names
+        faces = "".join(rule for family, rule in font_faces if f"'{family}'" in css)
+        files[name] = _write_hashed("css", name, ".css", (faces + minify_css(css)).encode())
+
+    manifest = {"sources": _sources_key(), "files": files}
+    with open(MANIFEST_PATH + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(MANIFEST_PATH + ".tmp", MANIFEST_PATH)
+
+    # Drop superseded stylesheet builds
+    live = set(files.values())
+    for entry in os.listdir(os.path.join(STATIC_DIR, "css")):
+        if f"css/{entry}" not in live:
+            os.remove(os.path.join(STATIC_DIR, "css", entry))
+    return manifest
+
+
+_manifest = None
+_lock = threading.Lock()
+
+
+def manifest():
+    """The current build manifest, rebuilding once per process if the sources changed"""
+    global _manifest
+    if _manifest is None:
+        with _lock:
+            if _manifest is None:
+                current = read_manifest()
+                if current is None or current.get("sources") != _sources_key():
+                    current = build()
+                _manifest = current
+    return _manifest
+
+
+def stylesheet_url(name):
+    return f"{STATIC_URL}/{manifest()['files'][name]}"
+
+
+def stylesheet_tag(name):
+    """<link> tag for a built stylesheet, for st.markdown(..., unsafe_allow_html=True)"""
+    return f'<link rel="stylesheet" href="{stylesheet_url(name)}">'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the CardioCare static stylesheets")
+    parser.add_argument("command", choices=["build", "check", "fetch-fonts"])
+    args = parser.parse_args()
+
+    if args.command == "fetch-fonts":
+        faces = fetch_fonts()
+        print(f"Fetched {len(faces)} font faces into {os.path.dirname(FONTS_INDEX)}")
+        args.command = "build"
+    if args.command == "check":
+        current = read_manifest()
+        fresh = current is not None and current.get("sources") == _sources_key()
+        print(f"{MANIFEST_PATH}: {'up to date' if fresh else 'STALE'}")
+        return 0 if fresh else 1
+    result = build()
+    for name, path in result["files"].items():
+        source = STYLESHEETS[name][0]
+        before = os.path.getsize(os.path.join(SOURCE_DIR, "css", source))
+        after = os.path.getsize(os.path.join(STATIC_DIR, path))
+        print(f"{name:<12} {source:<10} {before:>7,} -> {after:>7,} bytes  {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import argparse
+import csv
+import io
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from clinical import FEATURES, get_health_insights, heart_scores
+
+# --- STREAMING BATCH SCORER ---
+# Scores screening extracts laid out like cardio_train.csv
+# (id;age;gender;height;weight;ap_hi;ap_lo;cholesterol;gluc;smoke;alco;active[;cardio])
+# in fixed-size chunks, so memory stays flat no matter how large the file is.
+# With --workers > 1 the file is cut into newline-aligned byte ranges that
+# worker processes score independently; results are written back in order.
+
+INPUT_DTYPES = {
+    'id': np.int64,
+    'age': np.int32,
+    'gender': np.int8,
+    'height': np.int16,
+    'weight': np.float64,
+    'ap_hi': np.int16,
+    'ap_lo': np.int16,
+    'cholesterol': np.int8,
+    'gluc': np.int8,
+    'smoke': np.int8,
+    'alco': np.int8,
+    'active': np.int8,
+}
+OUTPUT_COLUMNS = ['id', 'prediction', 'probability', 'heart_score', 'bmi']
+DEFAULT_CHUNK_ROWS = 200_000
+DEFAULT_RANGE_BYTES = 8 << 20
+
+
+def peak_rss_mb(children=False):
+    """Peak resident set size in MiB of this process, or with `children` of
+    the largest finished child process (e.g. a pool worker)"""
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def rss_summary(workers=True):
+    """Peak RSS of this process, plus the largest worker's when the work ran in a process pool"""
+    text = f"peak RSS {peak_rss_mb():.1f} MiB"
+    return text + (f" (largest worker {peak_rss_mb(children=True):.1f} MiB)" if workers else "")
+
+
+def score_frame(df, engine, insights=False):
+    """Score one chunk; returns a DataFrame with OUTPUT_COLUMNS (+ insights)"""
+    # age is already in days and gender coded 1/2 - the same encoding Home.py sends
+    df = df.assign(age_y=(df['age'] // 365).astype(np.int32))
+    prediction, probability, _ = engine.evaluate(df[FEATURES].to_numpy(dtype=np.float32))
+    score, bmi = heart_scores(
+        df['height'].to_numpy(), df['weight'].to_numpy(dtype=np.float64),
+        df['ap_hi'].to_numpy(), df['ap_lo'].to_numpy(),
+        df['cholesterol'].to_numpy(), df['gluc'].to_numpy(),
+        df['smoke'].to_numpy(), df['alco'].to_numpy(), df['active'].to_numpy(),
+    )
+    out = pd.DataFrame({
+        'id': df['id'].to_numpy(),
+        'prediction': prediction,
+        'probability': probability,
+        'heart_score': score,
+        'bmi': bmi,
+    })
+    if insights:
+        columns = zip(prediction.tolist(), bmi.tolist(), df['ap_hi'].tolist(), df['ap_lo'].tolist(),
+                      df['cholesterol'].tolist(), df['gluc'].tolist(), df['smoke'].tolist(),
+                      df['alco'].tolist(), df['active'].tolist())
+        out['insights'] = [
+            " | ".join(get_health_insights(pred, None, b, hi, lo, chol, gluc, smoke, alco, active, []))
+            for pred, b, hi, lo, chol, gluc, smoke, alco, active in columns
+        ]
+    return out
+
+
+def read_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    return pd.read_csv(path, sep=';', dtype=INPUT_DTYPES, chunksize=chunk_rows)
+
+
+def write_chunk(out, frame, header):
+    frame.to_csv(out, sep=';', index=False, header=header, float_format='%.4f',
+                 quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+
+
+def score_file(input_path, output_path, model_path="heart_model.pkl", chunk_rows=DEFAULT_CHUNK_ROWS,
+               insights=False):
+    """Stream `input_path` through the model; returns (rows, seconds)"""
+    from tree_engine import get_engine
+
+    engine = get_engine(model_path)
+    rows = 0
+    start = time.perf_counter()
+    with open(output_path, 'w', newline='') as out:
+        for i, chunk in enumerate(read_chunks(input_path, chunk_rows)):
+            write_chunk(out, score_frame(chunk, engine, insights), header=(i == 0))
+            rows += len(chunk)
+    return rows, time.perf_counter() - start
+
+
+# --- PARALLEL MODE ---
+def byte_ranges(path, range_bytes=DEFAULT_RANGE_BYTES):
+    """Yield (start, end) offsets covering the data rows, each ending on a newline"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.readline()  # header
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + range_bytes, size))
+            if f.tell() < size:
+                f.readline()
+            end = f.tell()
+            yield start, end
+            start = end
+
+
+_worker = {}
+
+
+def _init_worker(path, engine, insights):
+    with open(path, 'rb') as f:
+        header = f.readline().decode().strip().split(';')
+    _worker.update(path=path, header=header, engine=engine, insights=insights)
+
+
+def _score_range(byte_range):
+    start, end = byte_range
+    with open(_worker['path'], 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    header = _worker['header']
+    df = pd.read_csv(io.BytesIO(data), sep=';', names=header, header=None,
+                     dtype={k: v for k, v in INPUT_DTYPES.items() if k in header})
+    out = io.StringIO()
+    write_chunk(out, score_frame(df, _worker['engine'], _worker['insights']), header=False)
+    return len(df), out.getvalue()
+
+
+def score_file_parallel(input_path, output_path, workers, model_path="heart_model.pkl",
+                        range_bytes=DEFAULT_RANGE_BYTES, insights=False):
+    """Score byte ranges in `workers` processes; returns (rows, seconds).
+
+    At most 2 * workers ranges are in flight, so memory is bounded by roughly
+    that many ranges of input plus their scored output.
+    """
+    from tree_engine import get_engine
+
+    columns = OUTPUT_COLUMNS + (['insights'] if insights else [])
+    rows = 0
+    start = time.perf_counter()
+    # Workers receive the flattened arrays, so they never unpickle or import sklearn
+    engine = get_engine(model_path)
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(input_path, engine, insights)) as pool, \
+            open(output_path, 'w', newline='') as out:
+        out.write(';'.join(columns) + '\n')
+        pending = []
+        for byte_range in byte_ranges(input_path, range_bytes):
+            pending.append(pool.submit(_score_range, byte_range))
+            if len(pending) >= 2 * workers:
+                n, text = pending.pop(0).result()
+                out.write(text)
+                rows += n
+        for future in pending:
+            n, text = future.result()
+            out.write(text)
+            rows += n
+    return rows, time.perf_counter() - start
+
+
+def benchmark(input_path, output_path, model_path="heart_model.pkl", max_workers=None,
+              range_bytes=DEFAULT_RANGE_BYTES, insights=False):
+    """Time the parallel mode at 1, 2, 4, ... workers and print the speedup"""
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = sorted({min(2 ** i, max_workers) for i in range(max_workers.bit_length() + 1)})
+    baseline = None
+    print(f"{'workers':>8} {'rows/s':>14} {'speedup':>8} {'efficiency':>10}")
+    for workers in counts:
+        rows, seconds = score_file_parallel(input_path, output_path, workers, model_path, range_bytes, insights)
+        rate = rows / max(seconds, 1e-9)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>14,.0f} {rate / baseline:>8.2f} {rate / baseline / workers:>10.0%}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Score a semicolon-delimited cardio_train-format file")
+    parser.add_argument("input", help="input file in cardio_train.csv layout")
+    parser.add_argument("output", help="where to write id;prediction;probability;heart_score;bmi")
+    parser.add_argument("--model", default="heart_model.pkl",
+                        help="pickled model or safe .npz artifact (default: %(default)s)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="rows held in memory at once (default: %(default)s)")
+    parser.add_argument("--insights", action="store_true",
+                        help="also write the get_health_insights text for each row")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="score byte ranges in this many processes (default: %(default)s)")
+    parser.add_argument("--range-mb", type=float, default=DEFAULT_RANGE_BYTES / (1 << 20),
+                        help="input bytes per work unit in parallel mode (default: %(default)s)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="measure scaling from 1 up to --workers processes instead of a single run")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    range_bytes = int(args.range_mb * (1 << 20))
+    if args.benchmark:
+        benchmark(args.input, args.output, args.model, args.workers, range_bytes, args.insights)
+        return 0
+    if args.workers > 1:
+        rows, seconds = score_file_parallel(args.input, args.output, args.workers, args.model,
+                                            range_bytes, args.insights)
+    else:
+        rows, seconds = score_file(args.input, args.output, args.model, args.chunk_rows, args.insights)
+    print(f"Scored {rows:,} rows in {seconds:.2f} s "
+          f"({rows / max(seconds, 1e-9):,.0f} rows/s), {rss_summary(args.workers > 1)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+# --- MICRO-BENCHMARK SUITE ---
+# Times the inference primitives, the report/CSS helpers, full headless
+# reruns of both Streamlit apps and their cold starts (checked against
+# COLD_START_BUDGETS). Every run is appended to a local history
+# file tagged with the current commit, and compared against the previous
+# run with a one-sided Mann-Whitney U test so only significant slowdowns
+# are flagged.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HISTORY_PATH = os.path.join(HERE, "benchmarks", "history.jsonl")
+
+SAMPLE_PATIENT = dict(age_years=52, gender="Male", height=172, weight=88.4, ap_hi=146, ap_lo=94,
+                      chol=2, gluc=1, smoke=True, alco=False, active=False)
+RISK_ENHANCERS = ["Family History of Heart Disease", "Metabolic Syndrome"]
+
+
+def _script_function(path, name, namespace):
+    """Pull one top-level function out of a Streamlit script without running the page"""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    node = next(n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == name)
+    exec(compile(ast.Module(body=[node], type_ignores=[]), path, "exec"), namespace)
+    return namespace[name]
+
+
+def _patient_row():
+    from clinical import FEATURES, encode_patient
+
+    p = SAMPLE_PATIENT
+    encoded = encode_patient(p['age_years'], p['gender'], p['height'], p['weight'], p['ap_hi'], p['ap_lo'],
+                             p['chol'], p['gluc'], p['smoke'], p['alco'], p['active'])
+    return encoded, np.array([[encoded[f] for f in FEATURES]], dtype=np.float64)
+
+
+def _batch(rows=10_000):
+    from tree_engine import _load_features
+    from clinical import FEATURES
+
+    X = _load_features(os.path.join(HERE, "cardio_train.csv"), FEATURES)
+    return X[np.random.default_rng(0).integers(0, len(X), rows)]
+
+
+# Each setup returns (callable, calls per sample)
+def setup_predict_sklearn_row():
+    from model_registry import get_model
+
+    model = get_model(os.path.join(HERE, "heart_model.pkl"))
+    _, row = _patient_row()
+    return (lambda: model.predict(row)), 200
+
+
+def setup_predict_compiled_row():
+    from tree_compiler import get_compiled
+
+    scorer = get_compiled(os.path.join(HERE, "heart_model.pkl"), os.path.join(HERE, "heart_model_compiled.py"))
+    patient, _ = _patient_row()
+    return (lambda: scorer.predict(patient)), 100_000
+
+
+def setup_predict_engine_batch():
+    from tree_engine import get_engine
+
+    engine = get_engine(os.path.join(HERE, "heart_model.pkl"))
+    X = _batch()
+    return (lambda: engine.evaluate(X)), 50
+
+
+def setup_predict_sklearn_batch():
+    from model_registry import get_model
+
+    model = get_model(os.path.join(HERE, "heart_model.pkl"))
+    X = _batch()
+    return (lambda: model.predict_proba(X)), 50
+
+
+def setup_calculate_heart_score():
+    from clinical import calculate_heart_score
+
+    p = SAMPLE_PATIENT
+    args = (p['age_years'], 2, p['height'], p['weight'], p['ap_hi'], p['ap_lo'],
+            p['chol'], p['gluc'], p['smoke'], p['alco'], p['active'])
+    return (lambda: calculate_heart_score(*args)), 100_000
+
+
+def setup_get_health_insights():
+    from clinical import get_health_insights
+
+    p = SAMPLE_PATIENT
+    args = (1, p['age_years'], 29.9, p['ap_hi'], p['ap_lo'], p['chol'], p['gluc'],
+            p['smoke'], p['alco'], p['active'], RISK_ENHANCERS)
+    return (lambda: get_health_insights(*args)), 100_000
+
+
+def setup_generate_pdf():
+    from clinical import get_health_insights
+    from reports import generate_pdf
+
+    p = SAMPLE_PATIENT
+    insights = get_health_insights(1, p['age_years'], 29.9, p['ap_hi'], p['ap_lo'], p['chol'], p['gluc'],
+                                   p['smoke'], p['alco'], p['active'], RISK_ENHANCERS)
+    user_data = {
+        'Age': p['age_years'], 'Gender': p['gender'], 'Height': p['height'], 'Weight': p['weight'],
+        'BMI': 29.9, 'Systolic BP': p['ap_hi'], 'Diastolic BP': p['ap_lo'],
+        'Cholesterol': "Above Normal", 'Glucose': "Normal",
+        'Smoking': p['smoke'], 'Alcohol': p['alco'], 'Active': p['active'],
+    }
+    return (lambda: generate_pdf(user_data, 1, 3, insights, RISK_ENHANCERS)), 20
+
+
+def setup_load_css():
+    import streamlit as st
+    from assets import stylesheet_tag
+
+    load_css = _script_function(os.path.join(HERE, "app.py"), "load_css",
+                                {"st": st, "stylesheet_tag": stylesheet_tag, "timed": lambda fn: fn})
+    return load_css, 200
+
+
+def _app_test(script, page=None, click=None):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(HERE, script), default_timeout=60)
+    if page is not None:
+        at.session_state.page = page
+    at.run()
+    if click is not None:
+        next(b for b in at.button if b.label.startswith(click)).click().run()
+
+    def rerun():
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"{script} raised: {at.exception[0].value}")
+    return rerun, 1
+
+
+def _page_setup(page):
+    return lambda: _app_test("app.py", page=page)
+
+
+def _cold_start(script, page=None):
+    from startup_profile import cold_start
+
+    return (lambda: cold_start(script, page)), 1
+
+
+def _baseline_cold_start():
+    # The same fresh interpreter, Streamlit import and AppTest run for a page
+    # that renders nothing: what every page pays on this machine
+    path = os.path.join(tempfile.gettempdir(), "cardiocare_empty_page.py")
+    with open(path, "w") as f:
+        f.write("import streamlit as st\nst.empty()\n")
+    return _cold_start(path)
+
+
+# Cold-start budgets: seconds a page's median cold start (fresh interpreter
+# to first render) may exceed COLD_START_BASELINE's median from the same run.
+# Comparing against the baseline keeps the check meaningful across machines
+# whose absolute cold starts differ by half a second. Measured here the pages
+# add ~0.1 s (medians 1.23 / 1.17 s vs 1.10 s); importing numpy, pandas and
+# plotly eagerly again adds ~0.55 s, well over the budget. Profile offenders
+# with `python startup_profile.py <script>`.
+COLD_START_BASELINE = "startup.baseline"
+COLD_START_BUDGETS = {
+    "startup.Home": 0.35,
+    "startup.app.home": 0.35,
+}
+COLD_START_MIN_SAMPLES = 15
+
+
+BENCHMARKS = {
+    "predict.sklearn.row": setup_predict_sklearn_row,
+    "predict.compiled.row": setup_predict_compiled_row,
+    "predict.engine.batch10k": setup_predict_engine_batch,
+    "predict.sklearn.batch10k": setup_predict_sklearn_batch,
+    "clinical.calculate_heart_score": setup_calculate_heart_score,
+    "clinical.get_health_insights": setup_get_health_insights,
+    "reports.generate_pdf": setup_generate_pdf,
+    "app.load_css": setup_load_css,
+    "rerun.Home": lambda: _app_test("Home.py", click="🚀 Analyze"),
+    **{f"rerun.app.{page}": _page_setup(page) for page in ("home", "predict", "insights", "caution", "about")},
+    COLD_START_BASELINE: _baseline_cold_start,
+    "startup.Home": lambda: _cold_start("Home.py"),
+    "startup.app.home": lambda: _cold_start("app.py", page="home"),
+}
+
+
+def run_benchmark(setup, samples):
+    """Return per-call seconds for `samples` timed samples after one warm-up"""
+    fn, calls = setup()
+    fn()
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        timings.append((time.perf_counter() - start) / calls)
+    return timings
+
+
+def current_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=HERE,
+                               capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def pick_baseline(history, commit, requested=None):
+    """Latest run of `requested`, else of any other commit, else the latest run at all"""
+    if requested:
+        runs = [h for h in history if h["commit"].startswith(requested)]
+    else:
+        runs = [h for h in history if h["commit"] != commit] or history
+    return runs[-1] if runs else None
+
+
+def compare(current, baseline, alpha=0.01, min_slowdown=0.05):
+    """Return {name: (ratio, p_value, regressed)} for benchmarks present in both runs"""
+    from scipy.stats import mannwhitneyu
+
+    report = {}
+    for name, samples in current.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        ratio = float(np.median(samples) / np.median(before))
+        p_value = float(mannwhitneyu(samples, before, alternative="greater").pvalue)
+        report[name] = (ratio, p_value, p_value < alpha and ratio > 1 + min_slowdown)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the CardioCare micro-benchmarks and check for regressions")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--samples", type=int, default=15, help="timed samples per benchmark")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--baseline", help="commit to compare against (default: latest run of another commit)")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--alpha", type=float, default=0.01, help="significance level for regressions")
+    parser.add_argument("--min-slowdown", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    try:
+        from streamlit import logger as st_logger
+
+        st_logger.set_log_level("error")  # bare-mode AppTest runs are noisy
+    except ImportError:
+        pass
+    os.chdir(HERE)
+    selected = [name for name in BENCHMARKS if args.filter in name]
+    if any(name in COLD_START_BUDGETS for name in selected) and COLD_START_BASELINE not in selected:
+        selected.insert(selected.index(next(n for n in selected if n in COLD_START_BUDGETS)), COLD_START_BASELINE)
+    results = {}
+    for name in selected:
+        cold = name in COLD_START_BUDGETS or name == COLD_START_BASELINE
+        results[name] = run_benchmark(BENCHMARKS[name], max(args.samples, COLD_START_MIN_SAMPLES) if cold
+                                      else args.samples)
+
+    commit = current_commit()
+    history = load_history(args.history)
+    baseline = pick_baseline(history, commit, args.baseline)
+    comparison = compare(results, baseline["results"], args.alpha, args.min_slowdown) if baseline else {}
+
+    print(f"{'benchmark':<32} {'median':>12} {'p90':>12} {'vs base':>8} {'p-value':>8}")
+    for name, samples in results.items():
+        median, p90 = np.median(samples), np.percentile(samples, 90)
+        line = f"{name:<32} {_fmt(median):>12} {_fmt(p90):>12}"
+        if name in comparison:
+            ratio, p_value, regressed = comparison[name]
+            line += f" {ratio:>7.2f}x {p_value:>8.3f}" + ("  REGRESSION" if regressed else "")
+        print(line)
+
+    over_budget = []
+    for name, budget in COLD_START_BUDGETS.items():
+        if name not in results:
+            continue
+        extra = np.median(results[name]) - np.median(results[COLD_START_BASELINE])
+        if extra > budget:
+            over_budget.append(name)
+            print(f"{name}: median cold start is {_fmt(extra)} over {COLD_START_BASELINE}, "
+                  f"past its {_fmt(budget)} budget")
+
+    if baseline:
+        print(f"Baseline: {baseline['commit']} ({baseline['timestamp']})")
+    if not args.no_save:
+        os.makedirs(os.path.dirname(args.history), exist_ok=True)
+        with open(args.history, "a") as f:
+            f.write(json.dumps({"commit": commit, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                                "results": results}) + "\n")
+    return 1 if over_budget or any(regressed for _, _, regressed in comparison.values()) else 0
+
+
+def _fmt(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.2f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# --- MODEL BENCHMARK HARNESS ---
+# Re-runs the notebook's candidate classifiers on the cleaned dataset and
+# records accuracy, fit time, inference latency and model size. Each model
+# trains in its own worker process; workers memory-map the cleaned matrix
+# cached by train.py instead of receiving a copy. app.py renders its model
+# comparison from the results file written here.
+
+RESULTS_PATH = os.path.join("benchmarks", "model_results.json")
+SCHEMA_VERSION = 1
+SINGLE_ROW_CALLS = 200
+
+# name -> (estimator factory spec, scale features first) as in cardio-checkpoint.ipynb
+CANDIDATES = {
+    "Decision Tree": ("sklearn.tree:DecisionTreeClassifier", {"max_depth": 5, "random_state": 42}, False),
+    "Random Forest": ("sklearn.ensemble:RandomForestClassifier",
+                      {"n_estimators": 200, "max_depth": 5, "random_state": 42}, False),
+    "Logistic Regression": ("sklearn.linear_model:LogisticRegression", {}, True),
+    "KNN": ("sklearn.neighbors:KNeighborsClassifier", {"n_neighbors": 5}, True),
+    "XGBoost": ("xgboost:XGBClassifier", {"eval_metric": "logloss", "random_state": 42, "n_jobs": 1}, True),
+    "Gradient Boosting": ("sklearn.ensemble:GradientBoostingClassifier",
+                          {"n_estimators": 100, "learning_rate": 0.1, "random_state": 42}, True),
+    "Naive Bayes": ("sklearn.naive_bayes:GaussianNB", {}, False),
+}
+# The five models the dashboard has always compared
+DEFAULT_MODELS = ["Decision Tree", "Random Forest", "Logistic Regression", "KNN", "XGBoost"]
+
+
+def _build(name):
+    import importlib
+
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    target, params, scaled = CANDIDATES[name]
+    module, cls = target.split(":")
+    estimator = getattr(importlib.import_module(module), cls)(**params)
+    return make_pipeline(StandardScaler(), estimator) if scaled else estimator
+
+
+def _benchmark_one(name, clean_dir, test_size, random_state):
+    import numpy as np
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+
+    X = np.load(os.path.join(clean_dir, "X.npy"), mmap_mode='r')
+    y = np.load(os.path.join(clean_dir, "y.npy"), mmap_mode='r')
+    # Same split as the notebook, derived locally so only paths cross processes
+    train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=test_size, random_state=random_state)
+    X_train, X_test, y_train, y_test = X[train_idx], X[test_idx], y[train_idx], y[test_idx]
+
+    model = _build(name)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    train_acc = accuracy_score(y_train, model.predict(X_train))
+
+    start = time.perf_counter()
+    test_pred = model.predict(X_test)
+    batch_seconds = time.perf_counter() - start
+    test_acc = accuracy_score(y_test, test_pred)
+
+    row = X_test[:1]
+    model.predict(row)  # warm-up
+    timings = []
+    for _ in range(SINGLE_ROW_CALLS):
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+
+    return name, {
+        "train_accuracy": round(train_acc * 100, 2),
+        "test_accuracy": round(test_acc * 100, 2),
+        "fit_seconds": fit_seconds,
+        "single_row_ms": float(np.median(timings) * 1000),
+        "batch_rows": int(len(y_test)),
+        "batch_ms": batch_seconds * 1000,
+        "batch_rows_per_second": len(y_test) / max(batch_seconds, 1e-9),
+        "model_bytes": len(pickle.dumps(model)),
+    }
+
+
+def run(models=None, data_path="cardio_train.csv", workers=None, test_size=0.2, random_state=42,
+        output_path=RESULTS_PATH):
+    """Benchmark `models` in parallel and write the versioned results file"""
+    from train import CLEAN_CACHE_DIR, CLEANING_VERSION, clean_dataset
+
+    models = list(models or DEFAULT_MODELS)
+    unknown = [m for m in models if m not in CANDIDATES]
+    if unknown:
+        raise ValueError(f"unknown models: {', '.join(unknown)}")
+
+    _, y, data_sha = clean_dataset(data_path)
+    clean_dir = os.path.join(CLEAN_CACHE_DIR, f"{data_sha}-v{CLEANING_VERSION}")
+
+    previous = load_results(output_path)
+    results, errors = {}, {}
+    workers = workers or min(len(models), os.cpu_count() or 1)
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {m: pool.submit(_benchmark_one, m, clean_dir, test_size, random_state) for m in models}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()[1]
+            except ImportError as e:
+                errors[name] = f"skipped: {e}"
+
+    report = {
+        "schema_version": SCHEMA_VERSION,
+        "version": (previous or {}).get("version", 0) + 1,
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "data_sha256": data_sha,
+        "rows": int(len(y)),
+        "split": {"test_size": test_size, "random_state": random_state},
+        "workers": workers,
+        "models": results,
+        "skipped": errors,
+    }
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, output_path)
+    return report
+
+
+def load_results(path=RESULTS_PATH):
+    """Return the last benchmark report, or None if it has not been generated"""
+    try:
+        with open(path) as f:
+            report = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return report if report.get("schema_version") == SCHEMA_VERSION else None
+
+
+def algo_table(path=RESULTS_PATH):
+    """{model: {"Train": %, "Test": %}} for the dashboard, in benchmark order"""
+    report = load_results(path)
+    if report is None:
+        return {}
+    return {
+        name: {"Train": r["train_accuracy"], "Test": r["test_accuracy"]}
+        for name, r in report["models"].items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the notebook's candidate models in parallel")
+    parser.add_argument("--models", nargs="+", choices=list(CANDIDATES), default=DEFAULT_MODELS)
+    parser.add_argument("--all", action="store_true", help="benchmark every notebook candidate")
+    parser.add_argument("--data", default="cardio_train.csv")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    models = list(CANDIDATES) if args.all else args.models
+    report = run(models, args.data, args.workers, output_path=args.output)
+    print(f"{'model':<20} {'train %':>8} {'test %':>8} {'fit s':>8} {'1-row ms':>9} {'batch rows/s':>13} {'size KB':>9}")
+    for name, r in report["models"].items():
+        print(f"{name:<20} {r['train_accuracy']:>8.2f} {r['test_accuracy']:>8.2f} {r['fit_seconds']:>8.2f} "
+              f"{r['single_row_ms']:>9.3f} {r['batch_rows_per_second']:>13,.0f} {r['model_bytes'] / 1024:>9.1f}")
+    for name, reason in report["skipped"].items():
+        print(f"{name:<20} {reason}")
+    print(f"Wrote {args.output} (version {report['version']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
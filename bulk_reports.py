@@ -0,0 +1,158 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from batch_score import INPUT_DTYPES, rss_summary
+from clinical import LEVEL_LABELS, get_health_insights
+
+# --- BULK CLINICAL REPORTS ---
+# Renders one PDF per patient for a whole screening batch. Takes the
+# screening extract (cardio_train.csv layout) and the file batch_score.py
+# wrote for it; both are read in lock-step chunks, rendered in worker
+# processes, and each finished chunk of PDFs is streamed into the ZIP
+# before the next one is collected, so memory stays bounded by the chunks
+# in flight rather than the batch size.
+
+DEFAULT_CHUNK_ROWS = 500
+GENDER_LABELS = {1: "Female", 2: "Male"}
+
+_worker = {}
+
+
+def _init_worker(generated_at):
+    # Imported once per process: FPDF's core-font metrics are cached at module
+    # level, so every report after the first reuses them
+    from reports import generate_pdf
+
+    _worker.update(generate_pdf=generate_pdf, generated_at=generated_at)
+
+
+def _patient_report(row, generate_pdf, generated_at):
+    prediction = int(row['prediction'])
+    age_years = int(row['age']) // 365
+    chol, gluc = int(row['cholesterol']), int(row['gluc'])
+    user_data = {
+        'Age': age_years,
+        'Gender': GENDER_LABELS.get(int(row['gender']), "Unknown"),
+        'Height': int(row['height']),
+        'Weight': float(row['weight']),
+        'BMI': float(row['bmi']),
+        'Systolic BP': int(row['ap_hi']),
+        'Diastolic BP': int(row['ap_lo']),
+        'Cholesterol': LEVEL_LABELS.get(chol, str(chol)),
+        'Glucose': LEVEL_LABELS.get(gluc, str(gluc)),
+        'Smoking': bool(row['smoke']),
+        'Alcohol': bool(row['alco']),
+        'Active': bool(row['active']),
+    }
+    insights = row.get('insights')
+    if isinstance(insights, str):
+        insights = insights.split(" | ")
+    else:
+        insights = get_health_insights(prediction, age_years, user_data['BMI'], user_data['Systolic BP'],
+                                       user_data['Diastolic BP'], chol, gluc, row['smoke'], row['alco'],
+                                       row['active'], [])
+    return generate_pdf(user_data, prediction, int(row['heart_score']), insights, [], generated_at)
+
+
+def _render_chunk(records):
+    generate_pdf, generated_at = _worker['generate_pdf'], _worker['generated_at']
+    return [(f"CardioCare_Report_{row['id']}.pdf", _patient_report(row, generate_pdf, generated_at))
+            for row in records]
+
+
+def read_batches(input_path, scored_path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield lists of patient + score records, checking both files line up by id"""
+    inputs = pd.read_csv(input_path, sep=';', dtype=INPUT_DTYPES, chunksize=chunk_rows)
+    scored = pd.read_csv(scored_path, sep=';', chunksize=chunk_rows)
+    mismatch = f"{scored_path} does not line up with {input_path}; re-run batch_score.py"
+    seen = set()
+    # zip_longest, so a file with extra rows is an error rather than silently cut short
+    for patients, scores in itertools.zip_longest(inputs, scored):
+        if patients is None or scores is None:
+            raise ValueError(mismatch)
+        if len(patients) != len(scores) or (patients['id'].to_numpy() != scores['id'].to_numpy()).any():
+            raise ValueError(mismatch)
+        # Each id names one report in the ZIP, and a repeat would also multiply rows in the merge
+        repeated = patients['id'][patients['id'].duplicated() | patients['id'].isin(seen)]
+        if len(repeated):
+            raise ValueError(f"{input_path}: patient id {repeated.iloc[0]} appears more than once")
+        seen.update(patients['id'].tolist())
+        yield patients.merge(scores, on='id', sort=False).to_dict('records')
+
+
+def write_reports(input_path, scored_path, output_path, workers=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                  limit=None):
+    """Render every patient's report into a ZIP at `output_path`; returns (reports, seconds).
+
+    At most 2 * workers chunks are in flight, so memory is bounded by that
+    many chunks of PDFs regardless of batch size.
+    """
+    workers = workers or os.cpu_count() or 1
+    # One timestamp for the whole batch, as if printed in a single run
+    generated_at = datetime.now()
+    count = 0
+    start = time.perf_counter()
+    tmp_path = output_path + ".tmp"
+
+    def drain(future):
+        nonlocal count
+        for name, pdf_bytes in future.result():
+            # PDF page streams are already deflated; storing avoids a second pass
+            archive.writestr(name, pdf_bytes)
+            count += 1
+
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(generated_at,)) as pool, \
+                zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_STORED) as archive:
+            pending = []
+            submitted = 0
+            for records in read_batches(input_path, scored_path, chunk_rows):
+                if limit is not None:
+                    records = records[:limit - submitted]
+                    if not records:
+                        break
+                pending.append(pool.submit(_render_chunk, records))
+                submitted += len(records)
+                if len(pending) >= 2 * workers:
+                    drain(pending.pop(0))
+            for future in pending:
+                drain(future)
+    except BaseException:
+        # Don't leave a half-written archive behind
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, output_path)
+    return count, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render one clinical PDF per patient into a ZIP archive")
+    parser.add_argument("input", help="screening extract in cardio_train.csv layout")
+    parser.add_argument("scored", help="the file batch_score.py wrote for it")
+    parser.add_argument("output", help="ZIP archive to write")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="rendering processes (default: one per CPU)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="patients per work unit (default: %(default)s)")
+    parser.add_argument("--limit", type=int, default=None, help="only render the first N patients")
+    args = parser.parse_args(argv)
+
+    count, seconds = write_reports(args.input, args.scored, args.output, args.workers, args.chunk_rows,
+                                   args.limit)
+    print(f"Wrote {count:,} reports to {args.output} in {seconds:.2f} s "
+          f"({count / max(seconds, 1e-9):,.0f} reports/s), "
+          f"{os.path.getsize(args.output) / 1e6:.1f} MB, {rss_summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# --- CLINICAL SCORING RULES ---
+# Shared by the Streamlit pages and the offline tools so every entry point
+# encodes patients and scores them the same way.
+
+# Column order the decision tree in heart_model.pkl was fitted on
+FEATURES = ['age', 'gender', 'height', 'weight', 'ap_hi', 'ap_lo',
+            'cholesterol', 'gluc', 'smoke', 'alco', 'active', 'age_y']
+
+GENDER_CODES = {"Female": 1, "Male": 2}
+LEVEL_LABELS = {1: "Normal", 2: "Above Normal", 3: "High"}
+# Lower edges (years) of the population age bands: <40, 40-45, ..., 60+
+AGE_BAND_EDGES = [40, 45, 50, 55, 60]
+
+
+def encode_patient(age_years, gender, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active):
+    """Encode form inputs the way the training data stores them (age in days, gender 1/2)"""
+    return {
+        'age': age_years * 365,
+        'gender': GENDER_CODES.get(gender, gender),
+        'height': height,
+        'weight': weight,
+        'ap_hi': ap_hi,
+        'ap_lo': ap_lo,
+        'cholesterol': chol,
+        'gluc': gluc,
+        'smoke': int(smoke),
+        'alco': int(alco),
+        'active': int(active),
+        'age_y': int(age_years),
+    }
+
+
+# --- HEALTHY HEART SCOREBOARD ---
+def calculate_heart_score(age, gender, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active):
+    """Calculate heart health score (0-7)"""
+    score = 0
+    bmi = weight / ((height/100)**2)
+    
+    if not smoke: score += 1
+    if not alco: score += 1
+    if active: score += 1
+    if 18.5 <= bmi <= 24.9: score += 1
+    if chol == 1: score += 1
+    if gluc == 1: score += 1
+    if ap_hi < 130 and ap_lo < 80: score += 1
+    
+    return score, bmi
+
+# --- DYNAMIC HEALTH INSIGHTS ---
+def get_health_insights(prediction, age, bmi, ap_hi, ap_lo, chol, gluc, smoke, alco, active, risk_enhancers):
+    """Generate personalized health insights"""
+    insights = []
+    
+    if prediction == 1:
+        insights.append("⚠️ HIGH RISK: Consult a healthcare professional immediately.")
+        
+        if smoke:
+            insights.append("🚭 QUIT SMOKING: Reduces heart disease risk by 50% within one year.")
+        
+        if ap_hi >= 140 or ap_lo >= 90:
+            insights.append("🩺 MANAGE BP: Reduce sodium, increase potassium-rich foods.")
+        
+        if bmi > 25:
+            insights.append(f"⚖️ WEIGHT MANAGEMENT: BMI {bmi:.1f}. Aim for 18.5-24.9.")
+        
+        if chol > 1:
+            insights.append("💊 LOWER CHOLESTEROL: Reduce saturated fats, increase fiber.")
+        
+        if gluc > 1:
+            insights.append("🍯 CONTROL GLUCOSE: Limit refined sugars and carbs.")
+        
+        if not active:
+            insights.append("🏃 EXERCISE: Aim for 150 minutes/week of moderate activity.")
+        
+        if alco:
+            insights.append("🍷 REDUCE ALCOHOL: Limit or eliminate consumption.")
+        
+        if risk_enhancers:
+            insights.append(f"⚠️ ADDITIONAL RISK FACTORS: {len(risk_enhancers)} clinical enhancer(s) identified.")
+    else:
+        insights.append("✅ LOW RISK: Maintain your healthy lifestyle.")
+        if bmi > 24.9:
+            insights.append("💪 Consider maintaining optimal weight.")
+        if not active:
+            insights.append("🏃 Add regular physical activity for optimal health.")
+    
+    return insights
+
+# --- CONTRIBUTING FACTORS ---
+def contributing_factors(age, height, weight, ap_hi, ap_lo, chol, gluc, smoke, active):
+    """List the risk markers present in a patient's inputs (age in years)"""
+    factors = []
+    if age > 50:
+        factors.append("Age > 50")
+    bmi = weight / ((height / 100) ** 2)
+    if bmi > 30:
+        factors.append(f"Obesity (BMI {bmi:.1f})")
+    if ap_hi > 140 or ap_lo > 90:
+        factors.append("Hypertension")
+    if chol == 3:
+        factors.append("Critically High Cholesterol")
+    elif chol == 2:
+        factors.append("Elevated Cholesterol")
+    if gluc > 1:
+        factors.append("Elevated Glucose")
+    if smoke:
+        factors.append("Smoker")
+    if not active:
+        factors.append("Sedentary Lifestyle")
+    return factors
+
+
+def heart_scores(height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active):
+    """Vectorized calculate_heart_score over NumPy columns; returns (scores, bmis)"""
+    import numpy as np
+
+    bmi = weight / ((height / 100) ** 2)
+    score = (
+        (smoke == 0).astype(np.int8)
+        + (alco == 0)
+        + (active != 0)
+        + ((bmi >= 18.5) & (bmi <= 24.9))
+        + (chol == 1)
+        + (gluc == 1)
+        + ((ap_hi < 130) & (ap_lo < 80))
+    )
+    return score.astype(np.int8), bmi
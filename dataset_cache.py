@@ -0,0 +1,296 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+# --- COLUMNAR DATASET CACHE ---
+# cardio_train.csv is converted once into one narrow-dtype .npy file per
+# column plus a meta.json. Loading memory-maps the columns, so readers share
+# the page cache instead of each re-parsing the CSV into float64/int64.
+
+DEFAULT_CSV_PATH = "cardio_train.csv"
+DEFAULT_CACHE_DIR = os.path.join(".cache", "cardio_train")
+FORMAT_VERSION = 1
+CHUNK_ROWS = 500_000
+
+COLUMN_DTYPES = {
+    'id': np.int32,
+    'age': np.int32,
+    'gender': np.int8,
+    'height': np.int16,
+    'weight': np.float32,
+    'ap_hi': np.int16,
+    'ap_lo': np.int16,
+    'cholesterol': np.int8,
+    'gluc': np.int8,
+    'smoke': np.int8,
+    'alco': np.int8,
+    'active': np.int8,
+    'cardio': np.int8,
+}
+
+
+def _source_fingerprint(csv_path):
+    from model_registry import file_digest
+
+    st = os.stat(csv_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": file_digest(csv_path)}
+
+
+def _count_rows(csv_path):
+    rows = 0
+    with open(csv_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 24), b""):
+            rows += block.count(b"\n")
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            rows += 1
+    return rows - 1  # header
+
+
+def convert(csv_path=DEFAULT_CSV_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """Write `csv_path` into `cache_dir` as memory-mappable columns; returns the row count"""
+    os.makedirs(cache_dir, exist_ok=True)
+    n_rows = _count_rows(csv_path)
+    with open(csv_path) as f:
+        header = f.readline().strip().split(';')
+    columns = [c for c in header if c in COLUMN_DTYPES]
+    # Private temp names, so concurrent converters never write into one file
+    tmp = {c: os.path.join(cache_dir, f"{c}.npy{_tmp_suffix()}") for c in columns}
+
+    # Filled chunk by chunk so peak memory is one chunk, not the whole file
+    outputs = {}
+    try:
+        for c in columns:
+            outputs[c] = np.lib.format.open_memmap(tmp[c], mode='w+', dtype=COLUMN_DTYPES[c], shape=(n_rows,))
+        offset = _fill(csv_path, columns, outputs)
+    except BaseException:
+        outputs.clear()
+        for path in tmp.values():
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    for c in columns:
+        arr = outputs.pop(c)
+        path = os.path.join(cache_dir, f"{c}.npy")
+        if offset < n_rows:
+            # Blank lines were counted as rows but never parsed; keep only the parsed rows
+            trimmed = path + _tmp_suffix() + ".trim"
+            with open(trimmed, "wb") as f:
+                np.save(f, arr[:offset])
+            del arr
+            os.replace(trimmed, path)
+            os.remove(tmp[c])
+        else:
+            arr.flush()
+            del arr
+            os.replace(tmp[c], path)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "rows": offset,
+        "columns": {c: np.dtype(COLUMN_DTYPES[c]).str for c in columns},
+        "source": {"path": os.path.abspath(csv_path), **_source_fingerprint(csv_path)},
+        "created_at": time.time(),
+    }
+    _write_meta(meta, cache_dir)
+    return offset
+
+
+def _tmp_suffix():
+    return f".tmp{os.getpid()}-{threading.get_ident()}"
+
+
+def _fill(csv_path, columns, outputs):
+    """Parse `csv_path` into the open column files; returns the rows written"""
+    import pandas as pd
+
+    offset = 0
+    for chunk in pd.read_csv(csv_path, sep=';', usecols=columns, chunksize=CHUNK_ROWS):
+        stop = offset + len(chunk)
+        for c in columns:
+            values = chunk[c].to_numpy()
+            dtype = np.dtype(COLUMN_DTYPES[c])
+            # pandas parses an integer column with empty fields as float64 (NaN)
+            if dtype.kind in "iu" and values.dtype.kind == "f" and np.isnan(values).any():
+                raise ValueError(f"column {c!r} has missing values")
+            narrowed = values.astype(dtype)
+            if dtype.kind in "iu" and not np.array_equal(narrowed, values):
+                raise ValueError(f"column {c!r} has values that do not fit {dtype}")
+            outputs[c][offset:stop] = narrowed
+        offset = stop
+    return offset
+
+
+def _write_meta(meta, cache_dir):
+    path = os.path.join(cache_dir, "meta.json")
+    tmp_path = path + _tmp_suffix()
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_meta(cache_dir=DEFAULT_CACHE_DIR):
+    try:
+        with open(os.path.join(cache_dir, "meta.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def is_current(csv_path=DEFAULT_CSV_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """True when `cache_dir` holds a conversion of the current `csv_path`"""
+    meta = read_meta(cache_dir)
+    if meta is None or meta.get("format_version") != FORMAT_VERSION:
+        return False
+    st = os.stat(csv_path)
+    source = meta["source"]
+    if source["size"] == st.st_size and source["mtime_ns"] == st.st_mtime_ns:
+        return True
+    fingerprint = _source_fingerprint(csv_path)
+    if source["sha256"] != fingerprint["sha256"]:
+        return False
+    # Touched but unchanged: record the new stat so later loads skip the hash
+    source.update(fingerprint)
+    try:
+        _write_meta(meta, cache_dir)
+    except OSError:
+        pass  # a read-only cache still works, it just re-hashes
+    return True
+
+
+class ColumnarDataset:
+    """Read-only, memory-mapped columns of the cardio dataset"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, meta=None, columns=None):
+        self.cache_dir = cache_dir
+        if columns is not None:
+            # Columns that are already mapped elsewhere (shared_store)
+            self.meta, self.columns = meta, columns
+            return
+        self.meta = read_meta(cache_dir)
+        if self.meta is None:
+            raise FileNotFoundError(f"no dataset cache in {cache_dir}; run: python dataset_cache.py convert")
+        self.columns = {
+            c: np.load(os.path.join(cache_dir, f"{c}.npy"), mmap_mode='r')
+            for c in self.meta["columns"]
+        }
+
+    @property
+    def version(self):
+        """Content hash of the source file; changes whenever the data does"""
+        return self.meta["source"]["sha256"]
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def to_frame(self, columns=None):
+        """Build a pandas DataFrame (copies the selected columns into memory)"""
+        import pandas as pd
+
+        return pd.DataFrame({c: np.asarray(self.columns[c]) for c in (columns or self.columns)})
+
+
+_convert_lock = threading.Lock()
+
+
+def load_dataset(csv_path=DEFAULT_CSV_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """Return the memory-mapped dataset, converting `csv_path` first if the cache is stale.
+
+    Replicas attached to a host shared-memory store (shared_store.py) read
+    the columns from there instead.
+    """
+    from shared_store import shared_dataset
+
+    shared = shared_dataset(csv_path)
+    if shared is not None:
+        return shared
+    if not is_current(csv_path, cache_dir):
+        with _convert_lock:
+            # Another thread may have converted it while we waited
+            if not is_current(csv_path, cache_dir):
+                convert(csv_path, cache_dir)
+    return ColumnarDataset(cache_dir)
+
+
+# --- BENCHMARK ---
+_BENCH_CSV = """
+import resource, time, numpy as np, pandas as pd
+start = time.perf_counter()
+df = pd.read_csv({csv!r}, sep=';')
+load = time.perf_counter() - start
+start = time.perf_counter()
+agg = (df['ap_hi'].mean(), df['cardio'].mean(), df.groupby('cholesterol')['cardio'].mean().to_dict())
+query = time.perf_counter() - start
+print(load, query, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+_BENCH_MMAP = """
+import resource, time, numpy as np
+from dataset_cache import ColumnarDataset
+start = time.perf_counter()
+ds = ColumnarDataset({cache_dir!r})
+load = time.perf_counter() - start
+start = time.perf_counter()
+chol, cardio = ds['cholesterol'], ds['cardio']
+agg = (ds['ap_hi'].mean(dtype=np.float64), cardio.mean(dtype=np.float64),
+       {{int(k): float(cardio[chol == k].mean(dtype=np.float64)) for k in (1, 2, 3)}})
+query = time.perf_counter() - start
+print(load, query, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def _run_isolated(code):
+    # A fresh interpreter per measurement keeps RSS readings independent
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    load, query, rss_kb = out.stdout.split()
+    return float(load), float(query), int(rss_kb) / 1024
+
+
+def benchmark(csv_path=DEFAULT_CSV_PATH, cache_dir=DEFAULT_CACHE_DIR, repeat=3):
+    load_dataset(csv_path, cache_dir)
+    csv_code = _BENCH_CSV.format(csv=os.path.abspath(csv_path))
+    mmap_code = _BENCH_MMAP.format(cache_dir=os.path.abspath(cache_dir))
+    print(f"{'loader':<14} {'load ms':>10} {'query ms':>10} {'peak RSS MiB':>13}")
+    for name, code in (("pd.read_csv", csv_code), ("memory-mapped", mmap_code)):
+        runs = [_run_isolated(code) for _ in range(repeat)]
+        load, query, rss = (min(r[i] for r in runs) for i in range(3))
+        print(f"{name:<14} {load * 1000:>10.2f} {query * 1000:>10.2f} {rss:>13.1f}")
+    on_disk = sum(os.path.getsize(os.path.join(cache_dir, f)) for f in os.listdir(cache_dir))
+    print(f"CSV {os.path.getsize(csv_path) / 1e6:.1f} MB -> columnar cache {on_disk / 1e6:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar, memory-mapped cache of cardio_train.csv")
+    parser.add_argument("command", choices=["convert", "check", "bench"])
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        start = time.perf_counter()
+        rows = convert(args.csv, args.cache_dir)
+        print(f"Wrote {rows:,} rows to {args.cache_dir} in {time.perf_counter() - start:.2f} s")
+    elif args.command == "check":
+        current = is_current(args.csv, args.cache_dir)
+        print(f"{args.cache_dir}: {'up to date' if current else 'STALE'}")
+        return 0 if current else 1
+    else:
+        benchmark(args.csv, args.cache_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
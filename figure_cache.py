@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import types
+from collections import OrderedDict
+
+from render_timing import register_stats
+
+# --- VERSION-KEYED FIGURE CACHE ---
+# The insights charts only change when the dataset or the benchmark results
+# do, yet every rerun rebuilt them through plotly's validating constructors
+# (px.bar alone is ~60 ms). Figures are now built once per (name, input
+# version, builder code) and kept as JSON specs: in process memory, shared
+# by every session, and under .cache/figures/ so restarts and replicas skip
+# the build too. A hit rehydrates the spec without re-validating it - it
+# was validated when it was built - which also makes st.plotly_chart's own
+# serialization cheaper.
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "figures")
+# Superseded figure files are removed only once this old, so a replica
+# still running the previous code can keep reading its version
+PRUNE_AFTER_SECONDS = 24 * 3600
+
+
+def version_of(value):
+    """Short content hash of JSON-serializable figure inputs, for use as a version"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _hash_code(code, namespace, digest, seen):
+    # Bytecode, names and constants only: line numbers and file paths stay out,
+    # so editing code above a builder doesn't invalidate its figures
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _hash_code(const, namespace, digest, seen)
+        elif isinstance(const, frozenset):
+            # Set order follows string hashing, which differs per process
+            digest.update(repr(sorted(map(repr, const))).encode())
+        else:
+            digest.update(repr(const).encode())
+    # Module-level values the code reads (labels, palettes) shape the figure
+    # too, and so do the module-level helpers it calls
+    for name in code.co_names:
+        if name not in namespace or name in seen:
+            continue
+        seen.add(name)
+        value = namespace[name]
+        if isinstance(value, types.FunctionType):
+            _hash_code(value.__code__, value.__globals__, digest, seen)
+        elif isinstance(value, (str, int, float, list, tuple, dict)):
+            # Plain data only: modules, lazy module proxies and classes are code
+            digest.update(f"{name}={json.dumps(value, sort_keys=True, default=repr)}".encode())
+
+
+def _code_version(build):
+    # Editing a builder invalidates its cached figures without a manual bump
+    fn = getattr(build, "func", build)
+    code = getattr(fn, "__code__", None)
+    if code is None:
+        return ""
+    digest = hashlib.sha256()
+    _hash_code(code, fn.__globals__, digest, set())
+    return digest.hexdigest()[:16]
+
+
+class FigureCache:
+    """Thread-safe LRU of serialized Plotly figures with hit/miss counters"""
+
+    def __init__(self, max_entries=64, cache_dir=DEFAULT_CACHE_DIR):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json") if self.cache_dir else None
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                return f.read()
+        except (TypeError, OSError):
+            return None
+
+    def _write_disk(self, name, key, spec):
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            with open(tmp_path, "w") as f:
+                f.write(spec)
+            os.replace(tmp_path, path)
+            # Drop this figure's other versions, once no replica can still be using them
+            cutoff = time.time() - PRUNE_AFTER_SECONDS
+            for entry in os.listdir(self.cache_dir):
+                stem, ext = os.path.splitext(entry)
+                other = os.path.join(self.cache_dir, entry)
+                if (ext == ".json" and stem != key and stem.rsplit("-", 3)[0] == name
+                        and os.path.getmtime(other) < cutoff):
+                    os.remove(other)
+        except OSError:
+            pass  # a read-only checkout still gets the in-memory cache
+
+    def get(self, name, version, build):
+        """Figure `name` for inputs at `version`, calling build() only on a miss"""
+        import plotly
+        import plotly.graph_objects as go
+
+        key = f"{name}-{version}-{_code_version(build)}-plotly{plotly.__version__}"
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if spec is None:
+            spec = self._read_disk(key)
+            from_disk = spec is not None
+            if not from_disk:
+                spec = build().to_json()
+                self._write_disk(name, key, spec)
+            with self._lock:
+                if from_disk:
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+                self._entries[key] = spec
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        # A fresh Figure per call, so a session can't mutate another's copy
+        return go.Figure(json.loads(spec), _validate=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'bytes': sum(len(spec) for spec in list(self._entries.values())),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+
+figure_cache = FigureCache()
+register_stats("figures", figure_cache.stats)
+
+
+def cached_figure(name, version, build):
+    """Figure through the process-wide FigureCache"""
+    return figure_cache.get(name, version, build)
@@ -0,0 +1,113 @@
+# Generated by tree_compiler.py from heart_model.pkl - do not edit by hand.
+# Regenerate with: python tree_compiler.py
+
+MODEL_SHA256 = "8db24a50a74c970fb2984129406cd25fd1bc7d69f301e47c9225f8432abe40c4"
+FEATURES = ['age', 'gender', 'height', 'weight', 'ap_hi', 'ap_lo', 'cholesterol', 'gluc', 'smoke', 'alco', 'active', 'age_y']
+CLASSES = [0, 1]
+
+
+def predict_leaf(p):
+    """Return (class, probability of class 1, leaf id) for one patient dict"""
+
+    if p['ap_hi'] <= 129.50000762939453:
+        if p['age'] <= 20130.0009765625:
+            if p['cholesterol'] <= 2.5000001192092896:
+                if p['age'] <= 16200.50048828125:
+                    if p['cholesterol'] <= 1.5000000596046448:
+                        return 0, 0.13013698630136986, 5
+                    else:
+                        return 0, 0.2899628252788104, 6
+                else:
+                    if p['ap_hi'] <= 119.50000381469727:
+                        return 0, 0.19426605504587155, 8
+                    else:
+                        return 0, 0.2845322153574581, 9
+            else:
+                if p['gluc'] <= 2.5000001192092896:
+                    if p['age'] <= 15161.50048828125:
+                        return 0, 0.47368421052631576, 12
+                    else:
+                        return 1, 0.7560975609756098, 13
+                else:
+                    if p['weight'] <= 80.50000381469727:
+                        return 0, 0.40954773869346733, 15
+                    else:
+                        return 1, 0.6263736263736264, 16
+        else:
+            if p['cholesterol'] <= 2.5000001192092896:
+                if p['age'] <= 22177.5009765625:
+                    if p['ap_hi'] <= 118.50000381469727:
+                        return 0, 0.28889990089197226, 20
+                    else:
+                        return 0, 0.40809555408095555, 21
+                else:
+                    if p['active'] <= 0.5000000298023224:
+                        return 1, 0.5971337579617835, 23
+                    else:
+                        return 0, 0.49846153846153846, 24
+            else:
+                if p['age'] <= 22147.5009765625:
+                    if p['weight'] <= 68.75000381469727:
+                        return 1, 0.5303030303030303, 27
+                    else:
+                        return 1, 0.7058823529411765, 28
+                else:
+                    if p['weight'] <= 57.50000190734863:
+                        return 1, 0.6451612903225806, 30
+                    else:
+                        return 1, 0.8211586901763224, 31
+    else:
+        if p['ap_hi'] <= 138.50000762939453:
+            if p['cholesterol'] <= 2.5000001192092896:
+                if p['age'] <= 21628.5009765625:
+                    if p['ap_lo'] <= 89.50000381469727:
+                        return 0, 0.4695369618196588, 36
+                    else:
+                        return 1, 0.5867469879518072, 37
+                else:
+                    if p['smoke'] <= 0.5000000298023224:
+                        return 1, 0.6458333333333334, 39
+                    else:
+                        return 0, 0.4927536231884058, 40
+            else:
+                if p['gluc'] <= 2.5000001192092896:
+                    if p['height'] <= 178.50000762939453:
+                        return 1, 0.8427835051546392, 43
+                    else:
+                        return 1, 0.6538461538461539, 44
+                else:
+                    if p['height'] <= 157.50000762939453:
+                        return 1, 0.8666666666666667, 46
+                    else:
+                        return 1, 0.7272727272727273, 47
+        else:
+            if p['ap_hi'] <= 149.50000762939453:
+                if p['height'] <= 147.50000762939453:
+                    if p['active'] <= 0.5000000298023224:
+                        return 0, 0.375, 51
+                    else:
+                        return 1, 0.7301587301587301, 52
+                else:
+                    if p['age'] <= 21963.5009765625:
+                        return 1, 0.8105825577387108, 54
+                    else:
+                        return 1, 0.8508997429305912, 55
+            else:
+                if p['ap_lo'] <= 68.50000381469727:
+                    if p['age'] <= 21044.5009765625:
+                        return 1, 0.5357142857142857, 58
+                    else:
+                        return 1, 0.8461538461538461, 59
+                else:
+                    if p['weight'] <= 52.50000190734863:
+                        return 1, 0.7570093457943925, 61
+                    else:
+                        return 1, 0.8641109552750507, 62
+
+
+def predict(p):
+    return predict_leaf(p)[0]
+
+
+def predict_proba(p):
+    return predict_leaf(p)[1]
@@ -0,0 +1,61 @@
+import logging
+import os
+import time
+
+from clinical import contributing_factors
+from prediction_cache import assess
+
+# --- SHARED INFERENCE PATH ---
+# One entry point for the Streamlit pages: the trained tree (via the compiled
+# scorer and the memoizing cache), deterministic contributing factors, and a
+# per-request latency check against a configurable budget.
+
+logger = logging.getLogger("cardiocare.inference")
+
+LATENCY_BUDGET_ENV = "CARDIOCARE_LATENCY_BUDGET_MS"
+DEFAULT_LATENCY_BUDGET_MS = 50.0
+
+
+def latency_budget_ms():
+    """Per-assessment budget in milliseconds, overridable via CARDIOCARE_LATENCY_BUDGET_MS"""
+    try:
+        return float(os.environ.get(LATENCY_BUDGET_ENV, DEFAULT_LATENCY_BUDGET_MS))
+    except ValueError:
+        return DEFAULT_LATENCY_BUDGET_MS
+
+
+def run_assessment(data, risk_enhancers=(), progress=None):
+    """Score one patient in app.py's encoding (age in years, gender 1/2, 0/1 habits).
+
+    `progress(fraction, text)` is called as each stage actually starts and
+    finishes. Returns the cached assessment plus probability, contributing
+    factors and the measured latency.
+    """
+    budget = latency_budget_ms()
+    start = time.perf_counter()
+
+    if progress:
+        progress(0.1, "Scoring vitals with the trained model...")
+    result = assess(
+        data['age'], data['gender'], data['height'], data['weight'], data['ap_hi'], data['ap_lo'],
+        data['cholesterol'], data['gluc'], data['smoke'], data['alco'], data['active'], risk_enhancers
+    )
+
+    if progress:
+        progress(0.7, "Identifying contributing factors...")
+    result['factors'] = contributing_factors(
+        data['age'], data['height'], data['weight'], data['ap_hi'], data['ap_lo'],
+        data['cholesterol'], data['gluc'], data['smoke'], data['active']
+    )
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    result['latency_ms'] = elapsed_ms
+    result['budget_ms'] = budget
+    result['within_budget'] = elapsed_ms <= budget
+    if progress:
+        progress(1.0, "Risk profile ready")
+
+    level = logging.INFO if result['within_budget'] else logging.WARNING
+    logger.log(level, "assessment took %.3f ms (budget %.1f ms, %s)", elapsed_ms, budget,
+               "ok" if result['within_budget'] else "OVER BUDGET")
+    return result
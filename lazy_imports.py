@@ -0,0 +1,53 @@
+import importlib
+import importlib.util
+import sys
+
+# --- LAZY IMPORT SHIM ---
+# Streamlit pages import their dependencies at the top, so every cold start
+# paid for pandas, numpy and plotly before the first widget rendered, even
+# on pages that never touch them. lazy_import() returns a stand-in that
+# imports the real module on first attribute access. A missing package
+# still raises ImportError at the call site, so `try: ... except ImportError`
+# fallbacks keep working.
+
+
+class LazyModule:
+    """Module proxy that imports `name` the first time an attribute is read"""
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            # import_module takes the per-module import lock, so concurrent
+            # sessions touching the proxy at once get the same module
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Defer importing `name` until first use; raises ImportError now if it is not installed"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    # For dotted names this imports the parent package, which is cheap for
+    # everything deferred here next to the module itself
+    if importlib.util.find_spec(name) is None:
+        raise ImportError(f"No module named {name!r}")
+    return LazyModule(name)
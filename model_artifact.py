@@ -0,0 +1,264 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import subprocess
+import sys
+import warnings
+import zipfile
+
+import numpy as np
+
+from clinical import FEATURES
+
+# --- SAFE MODEL ARTIFACT ---
+# heart_model.pkl can only be read by unpickling it, which imports sklearn,
+# runs arbitrary code and breaks across sklearn versions. The artifact stores
+# the flattened tree from tree_engine as plain .npy arrays plus a JSON header
+# (feature order, classes, training metadata, checksum) in one zip, and loads
+# with allow_pickle=False. The loader rejects a file whose checksum, feature
+# schema or tree structure does not hold before anything is served from it.
+
+DEFAULT_MODEL_PATH = "heart_model.pkl"
+DEFAULT_ARTIFACT_PATH = "heart_model.npz"
+ARTIFACT_SUFFIX = ".npz"
+FORMAT = "cardiocare-tree"
+FORMAT_VERSION = 1
+HEADER_NAME = "header.json"
+
+# Stored array name -> dtype; node ids and features fit far narrower types
+# than the intp the engine works in
+ARRAY_DTYPES = {
+    "feature": "<i2",
+    "threshold": "<f8",
+    "left": "<i4",
+    "right": "<i4",
+    "proba": "<f8",
+    "classes": "<i8",
+}
+
+
+class ArtifactError(ValueError):
+    """The artifact is corrupt, from an unknown format, or does not fit the expected schema"""
+
+
+def _checksum(header, arrays):
+    """SHA-256 over the header (minus the checksum) and every array's dtype, shape and bytes"""
+    digest = hashlib.sha256()
+    body = {k: v for k, v in header.items() if k != "checksum"}
+    digest.update(json.dumps(body, sort_keys=True).encode())
+    for name in sorted(arrays):
+        arr = np.ascontiguousarray(arrays[name])
+        digest.update(f"{name}:{arr.dtype.str}:{arr.shape}".encode())
+        digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+
+def export_engine(engine, output_path, metadata=None):
+    """Write a TreeEngine as an artifact; returns its header"""
+    if engine.feature_names is None:
+        raise ArtifactError("the tree has no feature names; refit it on a DataFrame")
+    arrays = {
+        "feature": engine.feature,
+        "threshold": engine.threshold,
+        "left": engine.left,
+        "right": engine.right,
+        "proba": engine.proba,
+        "classes": engine.classes,
+    }
+    arrays = {name: np.ascontiguousarray(arr, dtype=ARRAY_DTYPES[name]) for name, arr in arrays.items()}
+    header = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "features": list(engine.feature_names),
+        "classes": [int(c) for c in engine.classes],
+        "n_nodes": int(len(engine.feature)),
+        "max_depth": int(engine.max_depth),
+        "arrays": {name: {"dtype": arr.dtype.str, "shape": list(arr.shape)} for name, arr in arrays.items()},
+        "metadata": metadata or {},
+    }
+    header["checksum"] = _checksum(header, arrays)
+
+    tmp_path = output_path + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(HEADER_NAME, json.dumps(header, indent=2, sort_keys=True))
+        for name, arr in arrays.items():
+            buf = io.BytesIO()
+            np.lib.format.write_array(buf, arr, allow_pickle=False)
+            zf.writestr(f"{name}.npy", buf.getvalue())
+    os.replace(tmp_path, output_path)
+    return header
+
+
+def convert(model_path=DEFAULT_MODEL_PATH, output_path=DEFAULT_ARTIFACT_PATH):
+    """Convert the pickled sklearn tree into an artifact; returns its header"""
+    import sklearn
+
+    from model_registry import file_digest, get_model
+    from train import read_metadata
+    from tree_engine import TreeEngine
+
+    model = get_model(model_path)
+    engine = TreeEngine.from_sklearn(model)
+    training = read_metadata(model_path) or {}
+    metadata = {
+        "source_model": os.path.basename(model_path),
+        "source_sha256": file_digest(model_path),
+        "estimator": type(model).__name__,
+        "sklearn_version": sklearn.__version__,
+        "params": training.get("params"),
+        "data_sha256": training.get("data_sha256"),
+        "train_accuracy": training.get("train_accuracy"),
+        "test_accuracy": training.get("test_accuracy"),
+        "trained_at": training.get("trained_at"),
+    }
+    return export_engine(engine, output_path, metadata)
+
+
+def _validate(header, arrays, expected_features):
+    if header.get("format") != FORMAT or header.get("format_version") != FORMAT_VERSION:
+        raise ArtifactError(f"unsupported artifact format {header.get('format')!r} "
+                            f"v{header.get('format_version')}")
+    declared = header.get("arrays", {})
+    if set(arrays) != set(ARRAY_DTYPES) or set(declared) != set(ARRAY_DTYPES):
+        raise ArtifactError(f"expected arrays {sorted(ARRAY_DTYPES)}, found {sorted(arrays)}")
+    for name, arr in arrays.items():
+        if arr.dtype.str != declared[name]["dtype"] or list(arr.shape) != declared[name]["shape"]:
+            raise ArtifactError(f"array {name!r} does not match its header entry")
+    if header.get("checksum") != _checksum(header, arrays):
+        raise ArtifactError("checksum mismatch: the artifact is corrupt or was modified")
+
+    # Schema: the caller encodes rows in this exact column order
+    if expected_features is not None and header["features"] != list(expected_features):
+        raise ArtifactError(f"feature schema mismatch: artifact has {header['features']}, "
+                            f"expected {list(expected_features)}")
+
+    # Structure: every index must stay inside the arrays the engine walks
+    n_nodes, n_features = header["n_nodes"], len(header["features"])
+    feature, left, right = arrays["feature"], arrays["left"], arrays["right"]
+    proba, classes = arrays["proba"], arrays["classes"]
+    if not (len(feature) == len(arrays["threshold"]) == len(left) == len(right) == len(proba) == n_nodes):
+        raise ArtifactError("node arrays disagree on the number of nodes")
+    if n_nodes == 0 or feature.min() < 0 or feature.max() >= n_features:
+        raise ArtifactError("split feature index out of range")
+    if left.min() < 0 or right.min() < 0 or left.max() >= n_nodes or right.max() >= n_nodes:
+        raise ArtifactError("child index out of range")
+    if proba.ndim != 2 or proba.shape[1] != len(classes) or list(classes) != header["classes"]:
+        raise ArtifactError("class probabilities do not match the class labels")
+
+
+def load_artifact(path=DEFAULT_ARTIFACT_PATH, expected_features=FEATURES):
+    """Load and validate an artifact into a TreeEngine, without sklearn or pickle"""
+    from tree_engine import TreeEngine
+
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            if HEADER_NAME not in npz.files:
+                raise ArtifactError(f"{path} has no {HEADER_NAME}")
+            header = json.loads(npz[HEADER_NAME])
+            arrays = {name[:-len(".npy")] if name.endswith(".npy") else name: npz[name]
+                      for name in npz.files if name != HEADER_NAME}
+    except (zipfile.BadZipFile, ValueError, KeyError) as e:
+        if isinstance(e, ArtifactError):
+            raise
+        raise ArtifactError(f"{path} is not a readable artifact: {e}") from e
+    _validate(header, arrays, expected_features)
+
+    engine = TreeEngine(arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"],
+                        arrays["proba"], arrays["classes"], feature_names=header["features"],
+                        max_depth=header["max_depth"])
+    engine.header = header
+    return engine
+
+
+def read_header(path=DEFAULT_ARTIFACT_PATH):
+    """Return the artifact's JSON header without loading or validating the arrays"""
+    with zipfile.ZipFile(path) as zf:
+        return json.loads(zf.read(HEADER_NAME))
+
+
+_registry = None
+
+
+def get_artifact(path=DEFAULT_ARTIFACT_PATH):
+    """Return the shared TreeEngine for an artifact, reloaded when the file changes"""
+    global _registry
+    if _registry is None:
+        from model_registry import ModelRegistry
+
+        _registry = ModelRegistry(loader=load_artifact)
+    return _registry.get(path)
+
+
+# --- CLI ---
+_BENCH_LOAD = """
+import sys, time
+start = time.perf_counter()
+{imports}
+imported = time.perf_counter()
+{load}
+print(imported - start, time.perf_counter() - imported, "sklearn" in sys.modules)
+"""
+
+
+def _time_load(imports, load):
+    # A fresh interpreter per run so import costs are counted separately
+    code = _BENCH_LOAD.format(imports=imports, load=load)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    import_s, load_s, sklearn_loaded = out.stdout.split()
+    return float(import_s), float(load_s), sklearn_loaded == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert, check and time the safe model artifact")
+    parser.add_argument("command", choices=["convert", "check", "bench"])
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--artifact", default=DEFAULT_ARTIFACT_PATH)
+    parser.add_argument("--data", default="cardio_train.csv")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        header = convert(args.model, args.artifact)
+        print(f"Wrote {args.artifact} ({os.path.getsize(args.artifact):,} bytes, {header['n_nodes']} nodes, "
+              f"checksum {header['checksum'][:12]}) from {args.model} "
+              f"({os.path.getsize(args.model):,} bytes)")
+        args.command = "check"
+
+    if args.command == "check":
+        from model_registry import file_digest, get_model
+        from tree_engine import _load_features
+
+        try:
+            engine = load_artifact(args.artifact)
+        except ArtifactError as e:
+            print(f"{args.artifact}: INVALID - {e}")
+            return 1
+        source = engine.header["metadata"].get("source_sha256")
+        stale = os.path.exists(args.model) and source != file_digest(args.model)
+        X = _load_features(args.data, engine.feature_names)
+        model = get_model(args.model)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)  # plain arrays, no feature names
+            mismatches = int(np.count_nonzero(engine.predict(X) != model.predict(X)))
+            mismatches += int(not np.array_equal(engine.predict_proba(X), model.predict_proba(X)))
+        print(f"{args.artifact}: checksum and schema OK; "
+              f"{'STALE vs ' + args.model if stale else 'matches ' + args.model}; "
+              f"parity {'OK' if mismatches == 0 else f'{mismatches} mismatches'} on {len(X):,} rows")
+        return 0 if mismatches == 0 and not stale else 1
+
+    runs = {
+        "pickle": ("import pickle", f"pickle.load(open({args.model!r}, 'rb'))", args.model),
+        "artifact": ("from model_artifact import load_artifact", f"load_artifact({args.artifact!r})", args.artifact),
+    }
+    print(f"{'format':<10} {'bytes':>8} {'import ms':>10} {'load ms':>8} {'imports sklearn':>16}")
+    for name, (imports, load, path) in runs.items():
+        import_s, load_s, sklearn_loaded = min(_time_load(imports, load) for _ in range(3))
+        print(f"{name:<10} {os.path.getsize(path):>8,} {import_s * 1000:>10.1f} {load_s * 1000:>8.1f} "
+              f"{str(sklearn_loaded):>16}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
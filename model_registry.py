@@ -0,0 +1,140 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+# --- PROCESS-WIDE MODEL REGISTRY ---
+# Streamlit re-executes page scripts on every interaction, but imported modules
+# live for the whole server process. Keeping the registry here means every
+# session thread shares one unpickled model per file.
+
+DEFAULT_MODEL_PATH = "heart_model.pkl"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _rss_bytes():
+    """Current resident set size, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _Entry:
+    """A loaded model plus the file fingerprint it was loaded from"""
+
+    def __init__(self, model, mtime_ns, size, sha256, load_seconds, memory_bytes):
+        self.model = model
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.sha256 = sha256
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+        self.loaded_at = time.time()
+        self.loads = 1
+        self.hits = 0
+
+
+class ModelRegistry:
+    """Load each model file once and share it across threads.
+
+    A cheap os.stat() runs on every lookup; only when mtime or size change is
+    the file re-hashed, and only when the hash changes is it unpickled again.
+    """
+
+    def __init__(self, loader=None):
+        self._loader = loader or self._unpickle
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unpickle(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def _load(self, path, st, sha256):
+        # RSS delta rather than tracemalloc, which slowed the load ~5x; it
+        # includes modules the unpickle imports (sklearn on a first load)
+        before = _rss_bytes()
+        start = time.perf_counter()
+        model = self._loader(path)
+        elapsed = time.perf_counter() - start
+        after = _rss_bytes()
+        memory = max(after - before, 0) if before is not None and after is not None else None
+        return _Entry(model, st.st_mtime_ns, st.st_size, sha256, elapsed, memory)
+
+    def get(self, path=DEFAULT_MODEL_PATH):
+        """Return the model stored at `path`, loading or reloading it if needed"""
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        entry = self._entries.get(key)
+        if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+            entry.hits += 1
+            return entry.model
+
+        with self._lock:
+            # Another thread may have refreshed the entry while we waited
+            st = os.stat(key)
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+                entry.hits += 1
+                return entry.model
+
+            sha256 = file_digest(key)
+            if entry is not None and entry.sha256 == sha256:
+                # Touched but unchanged: keep the loaded object
+                entry.mtime_ns, entry.size = st.st_mtime_ns, st.st_size
+                entry.hits += 1
+                return entry.model
+
+            new_entry = self._load(key, st, sha256)
+            if entry is not None:
+                new_entry.loads = entry.loads + 1
+            self._entries[key] = new_entry
+            return new_entry.model
+
+    def fingerprint(self, path=DEFAULT_MODEL_PATH):
+        """Return the SHA-256 of the currently loaded version of `path`"""
+        self.get(path)
+        return self._entries[os.path.abspath(path)].sha256
+
+    def invalidate(self, path=None):
+        """Drop one cached model, or all of them"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+    def stats(self):
+        """Return load time, memory and usage counters per loaded model"""
+        return {
+            key: {
+                "sha256": entry.sha256,
+                "size_bytes": entry.size,
+                "load_ms": entry.load_seconds * 1000,
+                "memory_bytes": entry.memory_bytes,
+                "loaded_at": entry.loaded_at,
+                "loads": entry.loads,
+                "hits": entry.hits,
+            }
+            for key, entry in list(self._entries.items())
+        }
+
+
+registry = ModelRegistry()
+
+
+def get_model(path=DEFAULT_MODEL_PATH):
+    """Return the shared model for `path` from the process-wide registry"""
+    return registry.get(path)
@@ -0,0 +1,264 @@
+import argparse
+import json
+import logging
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+import zipfile
+
+from clinical import FEATURES
+from lazy_imports import lazy_import
+
+# --- "PATIENTS LIKE YOU" NEIGHBOUR INDEX ---
+# Outcome statistics for the k training patients most similar to an assessed
+# patient. A brute-force scan of the ~66k cleaned rows costs ~4 ms per query
+# and grows with the data; a KD-tree (scipy's cKDTree) over the standardized
+# features answers k=50 queries in ~0.05 ms. The tree is built once per
+# dataset version and persisted under .cache/neighbors/, next to the scaler
+# and outcomes, so a restart only loads it.
+#
+# The pickled tree is an index this module wrote itself into the local
+# cache, like the other .cache/ artifacts; it is never read from elsewhere.
+
+DEFAULT_DATA_PATH = "cardio_train.csv"
+DEFAULT_CACHE_DIR = os.path.join(".cache", "neighbors")
+INDEX_VERSION = 1
+DEFAULT_K = 50
+LEAF_SIZE = 32
+
+logger = logging.getLogger("cardiocare.neighbors")
+
+# Home.py imports this module on every cold start
+np = lazy_import("numpy")
+
+# Similarity space: every feature standardized to unit variance, so one
+# standard deviation of age counts as much as one of systolic BP
+NEIGHBOR_FEATURES = ['age_y', 'bmi', 'ap_hi', 'ap_lo', 'cholesterol', 'gluc', 'smoke', 'alco', 'active']
+
+
+def _feature_matrix(X):
+    """NEIGHBOR_FEATURES from a clean_dataset matrix (FEATURES order), as float64"""
+    col = {name: np.asarray(X[:, i], dtype=np.float64) for i, name in enumerate(FEATURES)}
+    col['bmi'] = col['weight'] / (col['height'] / 100) ** 2
+    return np.column_stack([col[name] for name in NEIGHBOR_FEATURES])
+
+
+class NeighborIndex:
+    """KD-tree over the standardized, cleaned training set plus each row's outcome"""
+
+    def __init__(self, tree, mean, scale, outcome, meta):
+        self.tree = tree
+        self.mean = mean
+        self.scale = scale
+        self.outcome = outcome
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.outcome)
+
+    def encode(self, age_years, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active):
+        """Standardized query point for one patient's form inputs"""
+        bmi = weight / ((height / 100) ** 2)
+        raw = np.array([age_years, bmi, ap_hi, ap_lo, chol, gluc, smoke, alco, active], dtype=np.float64)
+        return (raw - self.mean) / self.scale
+
+    def query(self, points, k=DEFAULT_K):
+        """(distances, row indices) of the k nearest training rows for each point"""
+        return self.tree.query(points, k=min(k, len(self)))
+
+    def similar(self, age_years, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active, k=DEFAULT_K):
+        """Outcome summary of the k training patients closest to these inputs"""
+        point = self.encode(age_years, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active)
+        distances, indices = self.query(point, k)
+        positives = int(self.outcome[indices].sum())
+        return {
+            'k': len(indices),
+            'positives': positives,
+            'cardio_rate': positives / len(indices),
+            'base_rate': self.meta['base_rate'],
+            'max_distance': float(distances[-1]),
+        }
+
+
+# --- BUILD / PERSIST ---
+def _index_dir(version, cache_dir):
+    return os.path.join(cache_dir, f"{version}-v{INDEX_VERSION}")
+
+
+def build_index(data_path=DEFAULT_DATA_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """Standardize the cleaned dataset, build the KD-tree and persist it; returns the index"""
+    from scipy.spatial import cKDTree
+
+    from train import clean_dataset
+
+    X, y, version = clean_dataset(data_path)
+    points = _feature_matrix(X)
+    mean, scale = points.mean(axis=0), points.std(axis=0)
+    scale[scale == 0] = 1.0
+    points = (points - mean) / scale
+    start = time.perf_counter()
+    # Sliding-midpoint splits suit the many tied values of the categorical
+    # columns better than median splits (~45 vs ~105 us per query here)
+    tree = cKDTree(points, leafsize=LEAF_SIZE, balanced_tree=False)
+    meta = {
+        "index_version": INDEX_VERSION,
+        "data_sha256": version,
+        "features": NEIGHBOR_FEATURES,
+        "rows": int(len(y)),
+        "base_rate": float(np.mean(y)),
+        "build_seconds": time.perf_counter() - start,
+        "built_at": time.time(),
+    }
+
+    target = _index_dir(version, cache_dir)
+    tmp = f"{target}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    np.savez(os.path.join(tmp, "scaler.npz"), mean=mean, scale=scale)
+    np.save(os.path.join(tmp, "outcome.npy"), np.asarray(y, dtype=np.int8))
+    with open(os.path.join(tmp, "tree.pkl"), "wb") as f:
+        pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    if os.path.exists(target):
+        # Another process built the same version first; keep theirs
+        shutil.rmtree(tmp)
+    else:
+        os.replace(tmp, target)
+    return NeighborIndex(tree, mean, scale, np.asarray(y, dtype=np.int8), meta)
+
+
+def load_index(version, cache_dir=DEFAULT_CACHE_DIR):
+    """The persisted index for a dataset version, or None if it was never built or is unreadable"""
+    target = _index_dir(version, cache_dir)
+    try:
+        with open(os.path.join(target, "meta.json")) as f:
+            meta = json.load(f)
+        with np.load(os.path.join(target, "scaler.npz"), allow_pickle=False) as scaler:
+            mean, scale = scaler['mean'], scaler['scale']
+        outcome = np.load(os.path.join(target, "outcome.npy"), allow_pickle=False)
+        with open(os.path.join(target, "tree.pkl"), "rb") as f:
+            tree = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (EOFError, ValueError, KeyError, pickle.UnpicklingError, zipfile.BadZipFile) as e:
+        # A truncated or corrupt cache; drop it so build_index can replace it
+        logger.warning("discarding unreadable neighbour index %s: %s", target, e)
+        shutil.rmtree(target, ignore_errors=True)
+        return None
+    if meta.get("features") != NEIGHBOR_FEATURES or tree.n != len(outcome):
+        return None
+    return NeighborIndex(tree, mean, scale, outcome, meta)
+
+
+_cached = {}
+_lock = threading.Lock()
+
+
+def get_index(data_path=DEFAULT_DATA_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """The index for the current `data_path`, loaded or built once per file version"""
+    st = os.stat(data_path)
+    key = (os.path.abspath(data_path), st.st_size, st.st_mtime_ns)
+    index = _cached.get(key)
+    if index is None:
+        with _lock:
+            index = _cached.get(key)
+            if index is None:
+                from dataset_cache import load_dataset
+
+                version = load_dataset(data_path).version
+                index = load_index(version, cache_dir) or build_index(data_path, cache_dir)
+                _cached.clear()
+                _cached[key] = index
+    return index
+
+
+_warming = None
+
+
+def _warm(data_path):
+    try:
+        get_index(data_path)
+    except Exception as e:
+        logger.warning("could not prepare the neighbour index: %s", e)
+
+
+def warm(data_path=DEFAULT_DATA_PATH):
+    """Load (or build) the index on a background thread, once per process.
+
+    Importing scipy alone takes ~0.5 s; pages call this after rendering so
+    the first assessment doesn't wait for it.
+    """
+    global _warming
+    if _warming is None and not _cached:
+        with _lock:
+            if _warming is None:
+                _warming = threading.Thread(target=_warm, args=(data_path,), name="neighbors-warm", daemon=True)
+                _warming.start()
+
+
+def patients_like(age_years, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active, k=DEFAULT_K):
+    """Outcome summary of the k most similar training patients, via the shared index"""
+    return get_index().similar(age_years, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active, k)
+
+
+# --- CLI ---
+def benchmark(data_path=DEFAULT_DATA_PATH, k=DEFAULT_K, queries=1000, seed=0):
+    index = get_index(data_path)
+    points = index.tree.data
+    rng = np.random.default_rng(seed)
+    # Jittered training rows: realistic patients that are not exact duplicates
+    sample = points[rng.choice(len(points), size=queries, replace=False)]
+    sample = sample + rng.normal(scale=0.05, size=sample.shape)
+
+    def brute(point):
+        d = np.sqrt(((points - point) ** 2).sum(axis=1))
+        idx = np.argpartition(d, k)[:k]
+        return np.sort(d[idx])
+
+    # Separate passes, so the brute-force scans don't evict the tree from cache
+    tree_times, results = [], []
+    for point in sample:
+        start = time.perf_counter()
+        distances, _ = index.query(point, k)
+        tree_times.append(time.perf_counter() - start)
+        results.append(distances)
+    brute_times, mismatches = [], 0
+    for point, distances in zip(sample, results):
+        start = time.perf_counter()
+        expected = brute(point)
+        brute_times.append(time.perf_counter() - start)
+        # Neighbour sets can differ among equidistant rows; the distances cannot
+        mismatches += not np.allclose(distances, expected)
+
+    def pct(values, q):
+        return np.percentile(values, q) * 1e6
+
+    print(f"Index: {len(index):,} rows x {len(NEIGHBOR_FEATURES)} features, k={k}, {queries:,} queries")
+    print(f"{'method':<12} {'p50 us':>9} {'p99 us':>9}")
+    print(f"{'kd-tree':<12} {pct(tree_times, 50):>9.1f} {pct(tree_times, 99):>9.1f}")
+    print(f"{'brute force':<12} {pct(brute_times, 50):>9.1f} {pct(brute_times, 99):>9.1f}")
+    print(f"Distance parity: {'OK' if mismatches == 0 else f'{mismatches} mismatches'}")
+    return 0 if mismatches == 0 else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="'Patients like you' nearest-neighbour index")
+    parser.add_argument("command", choices=["build", "bench"])
+    parser.add_argument("--data", default=DEFAULT_DATA_PATH)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        return benchmark(args.data, args.k)
+    index = build_index(args.data, args.cache_dir)
+    print(f"Built KD-tree over {len(index):,} rows in {index.meta['build_seconds'] * 1000:.1f} ms -> "
+          f"{_index_dir(index.meta['data_sha256'], args.cache_dir)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
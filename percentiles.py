@@ -0,0 +1,250 @@
+import argparse
+import bisect
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+
+from clinical import AGE_BAND_EDGES, FEATURES, GENDER_CODES
+from lazy_imports import lazy_import
+
+# --- POPULATION PERCENTILES (ECDF) ---
+# "Your systolic BP is higher than X% of people your age": for every
+# gender x age band group, the cleaned dataset's ap_hi, ap_lo, BMI and
+# weight values are sorted once and stored as one narrow-dtype .npy per vital
+# (groups back to back) plus the group offsets. Loading memory-maps them,
+# and a lookup is one binary search in the patient's group, O(log n), so
+# ranking needs neither a scan nor the dataset in memory.
+
+DEFAULT_DATA_PATH = "cardio_train.csv"
+DEFAULT_CACHE_DIR = os.path.join(".cache", "percentiles")
+TABLE_VERSION = 1
+VITALS = ['ap_hi', 'ap_lo', 'bmi', 'weight']
+# Stored dtypes: blood pressure is whole mmHg, so int16 is exact
+VITAL_DTYPES = {'ap_hi': 'int16', 'ap_lo': 'int16', 'bmi': 'float32', 'weight': 'float32'}
+VITAL_LABELS = {
+    'ap_hi': "systolic BP",
+    'ap_lo': "diastolic BP",
+    'bmi': "BMI",
+    'weight': "weight",
+}
+GENDER_GROUPS = {"Female": "women", "Male": "men"}
+
+logger = logging.getLogger("cardiocare.percentiles")
+
+# Home.py imports this module on every cold start
+np = lazy_import("numpy")
+
+
+def age_band(age_years):
+    """Index of the AGE_BAND_EDGES band that `age_years` falls in"""
+    return bisect.bisect_right(AGE_BAND_EDGES, age_years)
+
+
+def band_phrase(band):
+    if band == 0:
+        return f"under {AGE_BAND_EDGES[0]}"
+    if band == len(AGE_BAND_EDGES):
+        return f"{AGE_BAND_EDGES[-1]} and over"
+    return f"{AGE_BAND_EDGES[band - 1]}-{AGE_BAND_EDGES[band] - 1}"
+
+
+def _group(gender_code, band):
+    return (gender_code - 1) * (len(AGE_BAND_EDGES) + 1) + band
+
+
+class PercentileTable:
+    """Memory-mapped, per-group sorted vitals"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), allow_pickle=False)
+        self.values = {v: np.load(os.path.join(path, f"{v}.npy"), mmap_mode='r') for v in self.meta["vitals"]}
+
+    def rank(self, vital, value, gender, age_years):
+        """Share (0-100) of the patient's gender and age band with a lower `vital` than `value`"""
+        group = _group(GENDER_CODES.get(gender, gender), age_band(age_years))
+        start, stop = int(self.offsets[group]), int(self.offsets[group + 1])
+        if stop == start:
+            return None, 0
+        below = int(np.searchsorted(self.values[vital][start:stop], value, side="left"))
+        return below / (stop - start) * 100, stop - start
+
+    def profile(self, gender, age_years, ap_hi, ap_lo, bmi, weight):
+        """Percentile ranks for all VITALS, with a plain-language sentence each"""
+        peers = f"{GENDER_GROUPS.get(gender, 'people')} aged {band_phrase(age_band(age_years))}"
+        ranks = {}
+        for vital, value in zip(VITALS, (ap_hi, ap_lo, bmi, weight)):
+            percent, n = self.rank(vital, value, gender, age_years)
+            if percent is None:
+                continue
+            ranks[vital] = {
+                'value': value,
+                'percentile': percent,
+                'peers': n,
+                'text': f"Your {VITAL_LABELS[vital]} is higher than {percent:.0f}% of {peers}",
+            }
+        return ranks
+
+
+# --- BUILD ---
+def _table_dir(version, cache_dir):
+    return os.path.join(cache_dir, f"{version}-v{TABLE_VERSION}")
+
+
+def build_table(data_path=DEFAULT_DATA_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """Sort every vital within each gender x age band group of the cleaned dataset"""
+    from train import clean_dataset
+
+    X, _, version = clean_dataset(data_path)
+    col = {name: np.asarray(X[:, i]) for i, name in enumerate(FEATURES)}
+    col['bmi'] = col['weight'] / (col['height'] / 100) ** 2
+    bands = np.searchsorted(AGE_BAND_EDGES, col['age_y'], side="right")
+    groups = (col['gender'].astype(np.intp) - 1) * (len(AGE_BAND_EDGES) + 1) + bands
+    n_groups = len(GENDER_CODES) * (len(AGE_BAND_EDGES) + 1)
+    # One stable sort by group, then each vital sorted within its group slice
+    order = np.argsort(groups, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(groups, minlength=n_groups))]).astype(np.int64)
+
+    target = _table_dir(version, cache_dir)
+    tmp = f"{target}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    for vital in VITALS:
+        values = col[vital][order].astype(VITAL_DTYPES[vital])
+        for g in range(n_groups):
+            values[offsets[g]:offsets[g + 1]].sort()
+        np.save(os.path.join(tmp, f"{vital}.npy"), values)
+    np.save(os.path.join(tmp, "offsets.npy"), offsets)
+    meta = {
+        "table_version": TABLE_VERSION,
+        "data_sha256": version,
+        "vitals": VITALS,
+        "dtypes": VITAL_DTYPES,
+        "age_band_edges": AGE_BAND_EDGES,
+        "genders": GENDER_CODES,
+        "rows": int(offsets[-1]),
+        "built_at": time.time(),
+    }
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    if os.path.exists(target):
+        # Another process built the same version first; keep theirs
+        shutil.rmtree(tmp)
+    else:
+        os.replace(tmp, target)
+    return PercentileTable(target)
+
+
+def load_table(version, cache_dir=DEFAULT_CACHE_DIR):
+    """The stored table for a dataset version, or None if it was never built for this layout or is unreadable"""
+    target = _table_dir(version, cache_dir)
+    try:
+        table = PercentileTable(target)
+    except FileNotFoundError:
+        return None
+    except (EOFError, ValueError, KeyError) as e:
+        # A truncated or corrupt cache; drop it so build_table can replace it
+        logger.warning("discarding unreadable percentile table %s: %s", target, e)
+        shutil.rmtree(target, ignore_errors=True)
+        return None
+    if (table.meta.get("vitals") != VITALS or table.meta.get("dtypes") != VITAL_DTYPES
+            or table.meta.get("age_band_edges") != AGE_BAND_EDGES or table.meta.get("genders") != GENDER_CODES):
+        return None
+    return table
+
+
+_cached = {}
+_lock = threading.Lock()
+
+
+def get_table(data_path=DEFAULT_DATA_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """The table for the current `data_path`, loaded or built once per file version"""
+    st = os.stat(data_path)
+    key = (os.path.abspath(data_path), st.st_size, st.st_mtime_ns)
+    table = _cached.get(key)
+    if table is None:
+        with _lock:
+            table = _cached.get(key)
+            if table is None:
+                from dataset_cache import load_dataset
+
+                version = load_dataset(data_path).version
+                table = load_table(version, cache_dir) or build_table(data_path, cache_dir)
+                _cached.clear()
+                _cached[key] = table
+    return table
+
+
+def vital_percentiles(gender, age_years, ap_hi, ap_lo, bmi, weight):
+    """Percentile ranks of one patient's vitals, via the shared table"""
+    return get_table().profile(gender, age_years, ap_hi, ap_lo, bmi, weight)
+
+
+# --- CLI ---
+def benchmark(data_path=DEFAULT_DATA_PATH, lookups=10_000, seed=0):
+    from train import clean_dataset
+
+    table = get_table(data_path)
+    X, _, _ = clean_dataset(data_path)
+    gender, age_y, ap_hi = (np.asarray(X[:, FEATURES.index(c)]) for c in ('gender', 'age_y', 'ap_hi'))
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(X), size=lookups)
+    queries = [(int(gender[r]), int(age_y[r]), float(ap_hi[r]) + rng.integers(-10, 11)) for r in rows]
+
+    def scan(g, age, value):
+        # The same rank from the unsorted columns
+        same = (gender == g) & (np.searchsorted(AGE_BAND_EDGES, age_y, side="right") == age_band(age))
+        return (ap_hi[same] < value).mean() * 100
+
+    start = time.perf_counter()
+    ranks = [table.rank('ap_hi', v, g, a)[0] for g, a, v in queries]
+    ecdf_s = (time.perf_counter() - start) / lookups
+    n_scan = min(lookups, 200)
+    start = time.perf_counter()
+    expected = [scan(g, a, v) for g, a, v in queries[:n_scan]]
+    scan_s = (time.perf_counter() - start) / n_scan
+    mismatches = sum(not np.isclose(r, e) for r, e in zip(ranks, expected))
+
+    on_disk = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in
+                  os.walk(_table_dir(table.meta["data_sha256"], DEFAULT_CACHE_DIR)) for f in files)
+    print(f"Table: {table.meta['rows']:,} rows, {len(table.offsets) - 1} groups, {len(VITALS)} vitals, "
+          f"{on_disk / 1024:.0f} KiB on disk")
+    print(f"binary search {ecdf_s * 1e6:>8.1f} us/lookup")
+    print(f"column scan   {scan_s * 1e6:>8.1f} us/lookup")
+    print(f"Parity on {n_scan} lookups: {'OK' if mismatches == 0 else f'{mismatches} mismatches'}")
+    return 0 if mismatches == 0 else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Percentile ranks of vitals within gender and age band")
+    parser.add_argument("command", choices=["build", "query", "bench"])
+    parser.add_argument("--data", default=DEFAULT_DATA_PATH)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--gender", choices=list(GENDER_CODES), default="Female")
+    parser.add_argument("--age", type=int, default=50)
+    parser.add_argument("--ap-hi", type=float, default=120)
+    parser.add_argument("--ap-lo", type=float, default=80)
+    parser.add_argument("--height", type=float, default=170)
+    parser.add_argument("--weight", type=float, default=70)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        return benchmark(args.data)
+    if args.command == "build":
+        table = build_table(args.data, args.cache_dir)
+        print(f"Built percentile table for {table.meta['rows']:,} rows -> "
+              f"{_table_dir(table.meta['data_sha256'], args.cache_dir)}")
+        return 0
+    bmi = args.weight / (args.height / 100) ** 2
+    for rank in get_table(args.data, args.cache_dir).profile(args.gender, args.age, args.ap_hi, args.ap_lo,
+                                                             bmi, args.weight).values():
+        print(f"{rank['text']} (n={rank['peers']:,})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
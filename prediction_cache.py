@@ -0,0 +1,132 @@
+import threading
+from collections import OrderedDict
+
+from clinical import GENDER_CODES, calculate_heart_score, encode_patient, get_health_insights
+from render_timing import register_stats
+
+# --- MEMOIZED ASSESSMENT PIPELINE ---
+# Home.py inputs are heavily quantized (integer age/height/BP, 3-level labs,
+# boolean habits), so the same vectors recur constantly. Results of the full
+# prediction + heart score + insights pipeline are kept in a bounded LRU keyed
+# on the canonical input vector and the SHA-256 of the model that produced them.
+
+DEFAULT_MODEL_PATH = "heart_model.pkl"
+
+
+def canonical_key(age_years, gender, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active,
+                  risk_enhancers=()):
+    """Normalize form inputs so equivalent assessments share one cache entry"""
+    return (
+        int(age_years),
+        GENDER_CODES.get(gender, gender),
+        int(height),
+        round(float(weight), 1),  # the form steps weight in 0.1 kg
+        int(ap_hi),
+        int(ap_lo),
+        int(chol),
+        int(gluc),
+        int(bool(smoke)),
+        int(bool(alco)),
+        int(bool(active)),
+        tuple(risk_enhancers),
+    )
+
+
+class PredictionCache:
+    """Thread-safe LRU of assessment results with hit/miss/eviction counters"""
+
+    def __init__(self, max_entries=4096, model_path=DEFAULT_MODEL_PATH):
+        self.max_entries = max_entries
+        self.model_path = model_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_sha = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _scorer(self):
+        from tree_compiler import get_compiled
+
+        scorer = get_compiled(self.model_path)
+        if scorer.MODEL_SHA256 != self._model_sha:
+            # New model on disk: every cached answer is stale
+            with self._lock:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._model_sha = scorer.MODEL_SHA256
+        return scorer
+
+    def _compute(self, scorer, key):
+        (age_years, gender, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active,
+         risk_enhancers) = key
+        patient = encode_patient(age_years, gender, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active)
+        prediction, probability, _ = scorer.predict_leaf(patient)
+        score, bmi = calculate_heart_score(
+            age_years, gender, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active
+        )
+        insights = get_health_insights(
+            prediction, age_years, bmi, ap_hi, ap_lo, chol, gluc, smoke, alco, active, list(risk_enhancers)
+        )
+        return {'prediction': prediction, 'probability': probability, 'score': score, 'bmi': bmi,
+                'insights': tuple(insights)}
+
+    def assess(self, age_years, gender, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active,
+               risk_enhancers=()):
+        """Return prediction, probability, heart score, BMI and insights, computing them at most once per input"""
+        key = canonical_key(age_years, gender, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active,
+                            risk_enhancers)
+        scorer = self._scorer()
+        # The model hash is part of the key so a result computed while another
+        # thread swaps models can never be served for the new one
+        entry_key = (scorer.MODEL_SHA256, key)
+        with self._lock:
+            result = self._entries.get(entry_key)
+            if result is not None:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+        if result is None:
+            result = self._compute(scorer, key)
+            with self._lock:
+                self.misses += 1
+                self._entries[entry_key] = result
+                self._entries.move_to_end(entry_key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return {
+            'prediction': result['prediction'],
+            'probability': result['probability'],
+            'score': result['score'],
+            'bmi': result['bmi'],
+            'insights': list(result['insights']),
+            'risk_enhancers': list(key[-1]),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+cache = PredictionCache()
+register_stats("predictions", cache.stats)
+
+
+def assess(age_years, gender, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active, risk_enhancers=()):
+    """Cached assessment through the process-wide PredictionCache"""
+    return cache.assess(age_years, gender, height, weight, ap_hi, ap_lo, chol, gluc, smoke, alco, active,
+                        risk_enhancers)
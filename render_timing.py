@@ -0,0 +1,198 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# --- RENDER TIMING INSTRUMENTATION ---
+# Opt-in per-rerun timing for the Streamlit pages. Enable it with
+# CARDIOCARE_TIMING=1 or by opening a page with ?timing=1. Each page calls
+# begin_rerun() at the top and finish_rerun() at the bottom; in between,
+# @timed functions, `with section(...)` blocks and lap() checkpoints are
+# recorded, shown in a collapsible panel and logged as one JSON line per rerun
+# on the "cardiocare.timing" logger (and to CARDIOCARE_TIMING_LOG if set).
+# Outside an instrumented rerun every helper is a no-op, so shared modules
+# can use them freely.
+
+logger = logging.getLogger("cardiocare.timing")
+
+TIMING_ENV = "CARDIOCARE_TIMING"
+TIMING_LOG_ENV = "CARDIOCARE_TIMING_LOG"
+
+# Streamlit runs each session's script in its own thread
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class RerunTimer:
+    """Timings collected during one script run"""
+
+    def __init__(self, script, page=None, session_id=None):
+        self.script = script
+        self.page = page
+        self.session_id = session_id
+        self.start = time.perf_counter()
+        self.last_lap = self.start
+        self.depth = 0
+        self.entries = []
+
+    def record(self, name, started, elapsed, depth):
+        self.entries.append({"name": name, "depth": depth, "offset_ms": (started - self.start) * 1000,
+                             "ms": elapsed * 1000})
+
+    def as_dict(self, total_seconds):
+        return {
+            "ts": time.time(),
+            "script": self.script,
+            "page": self.page,
+            "session": self.session_id,
+            "total_ms": total_seconds * 1000,
+            "sections": sorted(self.entries, key=lambda e: e["offset_ms"]),
+        }
+
+
+def current():
+    return getattr(_local, "timer", None)
+
+
+def _enabled():
+    if os.environ.get(TIMING_ENV, "").lower() in ("1", "true", "yes"):
+        return True
+    try:
+        import streamlit as st
+
+        return st.query_params.get("timing") == "1"
+    except Exception:
+        return False
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+
+def begin_rerun(script, page=None):
+    """Start timing this rerun if instrumentation is enabled"""
+    _local.timer = RerunTimer(script, page, _session_id()) if _enabled() else None
+    return _local.timer
+
+
+@contextmanager
+def section(name):
+    """Time the enclosed block as `name` (nested sections are indented)"""
+    timer = current()
+    if timer is None:
+        yield
+        return
+    depth = timer.depth
+    timer.depth += 1
+    started = timer.last_lap = time.perf_counter()
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        timer.depth = depth
+        timer.record(name, started, now - started, depth)
+        # Laps only cover the code between recorded blocks
+        timer.last_lap = now
+
+
+def timed(fn=None, name=None):
+    """Decorator form of section(); defaults to the function's name"""
+    if fn is None:
+        return lambda f: timed(f, name)
+    label = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if current() is None:
+            return fn(*args, **kwargs)
+        with section(label):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def lap(name):
+    """Record the time since the previous lap or section boundary as `name`.
+
+    Meant for script code that is not wrapped in a function.
+    """
+    timer = current()
+    if timer is None:
+        return
+    now = time.perf_counter()
+    timer.record(name, timer.last_lap, now - timer.last_lap, timer.depth)
+    timer.last_lap = now
+
+
+@contextmanager
+def fragment_scope(script, name):
+    """Time an st.fragment body: a section during a full rerun, and a rerun
+    of its own when the fragment reruns alone"""
+    if current() is not None:
+        with section(name):
+            yield
+        return
+    if begin_rerun(script, page=name) is None:
+        yield
+        return
+    try:
+        yield
+    except BaseException:
+        _local.timer = None
+        raise
+    finish_rerun()
+
+
+_stats_sources = {}
+
+
+def register_stats(name, fn):
+    """Include fn()'s counters (e.g. a cache's stats()) in every rerun record and panel"""
+    _stats_sources[name] = fn
+
+
+def _export(record):
+    line = json.dumps(record)
+    logger.info(line)
+    path = os.environ.get(TIMING_LOG_ENV)
+    if path:
+        with _log_lock, open(path, "a") as f:
+            f.write(line + "\n")
+
+
+def finish_rerun():
+    """Log this rerun's timings and show them in a collapsible panel"""
+    timer = current()
+    if timer is None:
+        return None
+    _local.timer = None
+    total = time.perf_counter() - timer.start
+    record = timer.as_dict(total)
+    if _stats_sources:
+        record["caches"] = {name: fn() for name, fn in _stats_sources.items()}
+    _export(record)
+
+    import streamlit as st
+
+    with st.expander(f"⏱️ Render timings - {record['total_ms']:.1f} ms this rerun"):
+        rows = ["| Section | Start (ms) | Time (ms) | Share |", "|---|---:|---:|---:|"]
+        for entry in record["sections"]:
+            indent = "&nbsp;&nbsp;&nbsp;&nbsp;" * entry["depth"]
+            share = entry["ms"] / record["total_ms"] if record["total_ms"] else 0
+            rows.append(f"| {indent}{entry['name']} | {entry['offset_ms']:.1f} | {entry['ms']:.2f} | {share:.0%} |")
+        st.markdown("\n".join(rows), unsafe_allow_html=True)
+        if record.get("caches"):
+            rows = ["| Cache | Entries | Hits | Misses | Hit rate |", "|---|---:|---:|---:|---:|"]
+            for name, stats in record["caches"].items():
+                hits = stats["hits"] + stats.get("disk_hits", 0)
+                rows.append(f"| {name} | {stats['entries']} | {hits} | {stats['misses']} | {stats['hit_rate']:.0%} |")
+            st.markdown("\n".join(rows))
+    return record
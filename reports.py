@@ -0,0 +1,161 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from render_timing import register_stats
+
+# --- PDF GENERATION ---
+def _pdf_text(text):
+    """Core PDF fonts are latin-1 only: swap bullets and drop emoji"""
+    text = text.replace("•", "-").replace("–", "-")
+    return " ".join(text.encode("latin-1", "ignore").decode("latin-1").split())
+
+def generate_pdf(user_data, prediction, score, suggestions, risk_enhancers, generated_at=None):
+    """Generate professional PDF report"""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    
+    # Header
+    pdf.set_font("Arial", 'B', 20)
+    pdf.set_text_color(220, 38, 38)
+    pdf.cell(200, 10, "CardioCare AI - Clinical Report", ln=True, align='C')
+    pdf.ln(5)
+    
+    pdf.set_font("Arial", size=10)
+    pdf.set_text_color(0, 0, 0)
+    generated_at = generated_at or datetime.now()
+    pdf.cell(200, 5, f"Generated: {generated_at.strftime('%Y-%m-%d %H:%M:%S')}", ln=True, align='C')
+    pdf.ln(10)
+    
+    # Prediction Result
+    pdf.set_font("Arial", 'B', 16)
+    pdf.set_text_color(220, 38, 38)
+    result_text = "HIGH CARDIOVASCULAR RISK" if prediction == 1 else "LOW CARDIOVASCULAR RISK"
+    pdf.cell(200, 10, result_text, ln=True, align='C')
+    pdf.ln(8)
+    
+    # Heart Score
+    pdf.set_font("Arial", 'B', 14)
+    pdf.set_text_color(0, 0, 0)
+    pdf.cell(200, 8, f"Heart Health Score: {score}/7", ln=True)
+    pdf.ln(5)
+    
+    # Patient Information
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(200, 8, "Patient Information:", ln=True)
+    pdf.set_font("Arial", size=10)
+    pdf.cell(200, 6, f"Age: {user_data['Age']} years", ln=True)
+    pdf.cell(200, 6, f"Gender: {user_data['Gender']}", ln=True)
+    pdf.cell(200, 6, f"Height: {user_data['Height']} cm | Weight: {user_data['Weight']} kg", ln=True)
+    pdf.cell(200, 6, f"BMI: {user_data['BMI']:.1f}", ln=True)
+    pdf.cell(200, 6, f"Blood Pressure: {user_data['Systolic BP']}/{user_data['Diastolic BP']} mmHg", ln=True)
+    pdf.cell(200, 6, f"Cholesterol: {user_data['Cholesterol']} | Glucose: {user_data['Glucose']}", ln=True)
+    pdf.ln(5)
+    
+    # Risk Enhancers
+    if risk_enhancers:
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(200, 8, "Clinical Risk Enhancers:", ln=True)
+        pdf.set_font("Arial", size=10)
+        for enhancer in risk_enhancers:
+            pdf.cell(200, 6, _pdf_text(f"• {enhancer}"), ln=True)
+        pdf.ln(5)
+    
+    # Recommendations
+    if suggestions:
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(200, 8, "Recommendations:", ln=True)
+        pdf.set_font("Arial", size=10)
+        for suggestion in suggestions[:8]:  # Limit for PDF
+            pdf.cell(200, 6, _pdf_text(f"• {suggestion}"), ln=True)
+    
+    pdf.ln(10)
+    pdf.set_font("Arial", 'I', 8)
+    pdf.set_text_color(128, 128, 128)
+    pdf.cell(200, 5, "Disclaimer: Educational purposes only. Not a substitute for medical advice.", ln=True, align='C')
+    
+    return pdf.output(dest='S').encode('latin-1')
+
+
+# --- REPORT CACHE ---
+# Building a report means laying out a full FPDF document, so Home.py only
+# asks for one when the download button is clicked. The bytes are kept in a
+# process-wide LRU keyed on a hash of the report inputs, shared by every
+# session and bounded by entry count and total size. A cached report keeps
+# the "Generated" time of its first build.
+
+def report_key(user_data, prediction, score, suggestions, risk_enhancers):
+    """SHA-256 of the canonical report inputs"""
+    payload = json.dumps(
+        [user_data, prediction, score, list(suggestions), list(risk_enhancers)],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ReportCache:
+    """Thread-safe LRU of generated PDF bytes with hit/miss/eviction counters"""
+
+    def __init__(self, max_entries=256, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_data, prediction, score, suggestions, risk_enhancers):
+        """Return the PDF for these inputs, generating it at most once"""
+        key = report_key(user_data, prediction, score, suggestions, risk_enhancers)
+        with self._lock:
+            pdf_bytes = self._entries.get(key)
+            if pdf_bytes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pdf_bytes
+        pdf_bytes = generate_pdf(user_data, prediction, score, list(suggestions), list(risk_enhancers))
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = pdf_bytes
+                self.total_bytes += len(pdf_bytes)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries or (
+                    self.total_bytes > self.max_bytes and len(self._entries) > 1):
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+                self.evictions += 1
+        return pdf_bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+report_cache = ReportCache()
+register_stats("reports", report_cache.stats)
+
+
+def cached_pdf(user_data, prediction, score, suggestions, risk_enhancers):
+    """Report bytes through the process-wide ReportCache"""
+    return report_cache.get(user_data, prediction, score, suggestions, risk_enhancers)
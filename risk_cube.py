@@ -0,0 +1,392 @@
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from clinical import AGE_BAND_EDGES, GENDER_CODES, LEVEL_LABELS
+
+# --- POPULATION RISK CUBE ---
+# A materialized count cube over age band x gender x cholesterol x gluc x
+# smoke x active x BMI band: patients and cardio=1 cases per cell (2,160
+# cells). Any roll-up or slice is a sum over that small dense array, so it
+# takes a couple of milliseconds and the raw rows are never grouped again.
+#
+# The cube records how many bytes of the CSV it has consumed. When labeled
+# rows are appended, `update` parses only the new bytes and adds them in;
+# it rebuilds from scratch only if the consumed part of the file changed.
+
+DEFAULT_CSV_PATH = "cardio_train.csv"
+DEFAULT_CACHE_DIR = os.path.join(".cache", "risk_cube")
+FORMAT_VERSION = 1
+READ_BLOCK = 1 << 24  # bytes parsed per step; bounds memory on large appends
+TAIL_BYTES = 1 << 16  # consumed bytes re-hashed to detect a rewritten file
+
+BMI_BAND_EDGES = [18.5, 25, 30, 35]
+YES_NO = ["No", "Yes"]
+
+logger = logging.getLogger("cardiocare.risk_cube")
+
+
+def _band_labels(edges, fmt):
+    labels = [f"<{fmt(edges[0])}"]
+    labels += [f"{fmt(lo)}-{fmt(hi)}" for lo, hi in zip(edges, edges[1:])]
+    return labels + [f"{fmt(edges[-1])}+"]
+
+
+# Cube axes in storage order: name -> (labels, codes from dataset columns)
+DIMENSIONS = {
+    "age_band": (_band_labels(AGE_BAND_EDGES, str),
+                 lambda c: np.searchsorted(AGE_BAND_EDGES, c['age'] // 365, side="right")),
+    "gender": (list(GENDER_CODES), lambda c: c['gender'] - 1),
+    "cholesterol": (list(LEVEL_LABELS.values()), lambda c: c['cholesterol'] - 1),
+    "gluc": (list(LEVEL_LABELS.values()), lambda c: c['gluc'] - 1),
+    "smoke": (YES_NO, lambda c: c['smoke']),
+    "active": (YES_NO, lambda c: c['active']),
+    "bmi_band": (_band_labels(BMI_BAND_EDGES, lambda v: f"{v:g}"),
+                 lambda c: np.searchsorted(BMI_BAND_EDGES, c['weight'] / (c['height'] / 100) ** 2,
+                                           side="right")),
+}
+SOURCE_COLUMNS = ['age', 'gender', 'height', 'weight', 'cholesterol', 'gluc', 'smoke', 'active', 'cardio']
+
+
+class RiskCube:
+    """Patients and positive cases per cell of DIMENSIONS"""
+
+    def __init__(self, counts=None, positives=None, meta=None):
+        shape = tuple(len(labels) for labels, _ in DIMENSIONS.values())
+        self.counts = np.zeros(shape, dtype=np.int64) if counts is None else counts
+        self.positives = np.zeros(shape, dtype=np.int64) if positives is None else positives
+        self.meta = meta or {}
+        # Rows left out of the cube for a missing or out-of-range value
+        self.skipped = self.meta.get("source", {}).get("skipped", 0)
+
+    @property
+    def rows(self):
+        return int(self.counts.sum())
+
+    def add_rows(self, columns):
+        """Add labeled rows given as a mapping of SOURCE_COLUMNS to arrays (e.g. a DataFrame).
+
+        Rows with a missing value or one outside a dimension's categories are
+        skipped, counted in `skipped` and logged; returns the number added.
+        """
+        columns = {c: np.asarray(columns[c], dtype=np.float64) for c in SOURCE_COLUMNS}
+        problems = {
+            "missing values": ~np.logical_and.reduce([np.isfinite(v) for v in columns.values()]),
+            "cardio": ~np.isin(columns['cardio'], (0, 1)),
+        }
+        codes = []
+        for name, (labels, code) in DIMENSIONS.items():
+            values = code(columns)
+            problems[name] = (values < 0) | (values >= len(labels))
+            codes.append(values)
+        valid = ~np.logical_or.reduce(list(problems.values()))
+        if not valid.all():
+            skipped = int(len(valid) - valid.sum())
+            self.skipped += skipped
+            logger.warning("skipped %d rows with missing or out-of-range values (%s)", skipped,
+                           ", ".join(f"{name}: {int(bad.sum()):,}" for name, bad in problems.items() if bad.any()))
+        cells = np.ravel_multi_index([values[valid].astype(np.intp) for values in codes], self.counts.shape)
+        size = self.counts.size
+        self.counts += np.bincount(cells, minlength=size).reshape(self.counts.shape)
+        self.positives += np.bincount(cells, weights=columns['cardio'][valid], minlength=size).astype(
+            np.int64).reshape(self.counts.shape)
+        return len(cells)
+
+    def _selection(self, name, values):
+        labels = DIMENSIONS[name][0]
+        values = [values] if isinstance(values, str) else list(values)
+        unknown = [v for v in values if v not in labels]
+        if unknown:
+            raise ValueError(f"{name}: unknown {unknown}; expected one of {labels}")
+        return [labels.index(v) for v in values]
+
+    def rollup(self, by=(), where=None):
+        """Patients, positives and rate per combination of `by`, over the cells matching `where`.
+
+        `where` maps dimension names to a label or a list of labels, e.g.
+        rollup(by=["age_band", "gender"], where={"smoke": "Yes", "cholesterol": ["Above Normal", "High"]}).
+        Returns a DataFrame with one row per combination of the `by` labels.
+        """
+        import pandas as pd
+
+        names = list(DIMENSIONS)
+        where = where or {}
+        for name in [*by, *where]:
+            if name not in DIMENSIONS:
+                raise ValueError(f"unknown dimension {name!r}; expected one of {names}")
+        index = [self._selection(name, where[name]) if name in where else slice(None) for name in names]
+        counts, positives = self.counts, self.positives
+        # One axis at a time keeps every other axis intact (np.ix_ would need all lists)
+        for axis, sel in enumerate(index):
+            if not isinstance(sel, slice):
+                counts, positives = counts.take(sel, axis=axis), positives.take(sel, axis=axis)
+        keep = [names.index(name) for name in by]
+        dropped = tuple(axis for axis in range(len(names)) if axis not in keep)
+        # Sum the other axes away, then order the remaining ones as requested
+        counts, positives = counts.sum(axis=dropped), positives.sum(axis=dropped)
+        if keep:
+            order = np.argsort(np.argsort(keep))
+            counts, positives = counts.transpose(order), positives.transpose(order)
+
+        labels = []
+        for name in by:
+            sel, all_labels = index[names.index(name)], DIMENSIONS[name][0]
+            labels.append(all_labels if isinstance(sel, slice) else [all_labels[i] for i in sel])
+        if by:
+            frame = pd.MultiIndex.from_product(labels, names=list(by)).to_frame(index=False)
+        else:
+            frame = pd.DataFrame(index=[0])
+        frame['patients'] = np.asarray(counts).ravel()
+        frame['positives'] = np.asarray(positives).ravel()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frame['rate'] = frame['positives'] / frame['patients']
+        return frame
+
+
+# --- STORAGE ---
+def _tail_digest(f, end):
+    f.seek(max(0, end - TAIL_BYTES))
+    return hashlib.sha256(f.read(min(end, TAIL_BYTES))).hexdigest()
+
+
+def _schema():
+    return {name: labels for name, (labels, _) in DIMENSIONS.items()}
+
+
+def save(cube, cache_dir=DEFAULT_CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = os.path.join(cache_dir, "cube.tmp.npz")
+    np.savez(tmp_path, counts=cube.counts, positives=cube.positives)
+    os.replace(tmp_path, os.path.join(cache_dir, "cube.npz"))
+    with open(os.path.join(cache_dir, "meta.json.tmp"), "w") as f:
+        json.dump(cube.meta, f, indent=2)
+    os.replace(os.path.join(cache_dir, "meta.json.tmp"), os.path.join(cache_dir, "meta.json"))
+
+
+def load(cache_dir=DEFAULT_CACHE_DIR):
+    """The stored cube, or None if there is none or it was built for other dimensions"""
+    try:
+        with open(os.path.join(cache_dir, "meta.json")) as f:
+            meta = json.load(f)
+        with np.load(os.path.join(cache_dir, "cube.npz"), allow_pickle=False) as npz:
+            counts, positives = npz['counts'], npz['positives']
+    except (FileNotFoundError, json.JSONDecodeError, ValueError):
+        return None
+    if meta.get("format_version") != FORMAT_VERSION or meta.get("dimensions") != _schema():
+        return None
+    # The meta file is written second, so a crash between the two writes
+    # leaves counts ahead of the recorded offset; catch that here
+    if int(counts.sum()) != meta["source"]["rows"]:
+        return None
+    return RiskCube(counts, positives, meta)
+
+
+# --- BUILD / INCREMENTAL UPDATE ---
+def _scan(cube, csv_path, start, header):
+    """Add the complete lines of `csv_path` from byte `start` on; returns the new offset"""
+    import pandas as pd
+
+    def add(data):
+        if data.strip():
+            cube.add_rows(pd.read_csv(io.BytesIO(data), sep=';', names=header, usecols=SOURCE_COLUMNS))
+
+    offset = start
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        pending = b""
+        for block in iter(lambda: f.read(READ_BLOCK), b""):
+            data = pending + block
+            cut = data.rfind(b"\n") + 1
+            data, pending = data[:cut], data[cut:]
+            add(data)
+            offset += len(data)
+    if pending.strip():
+        # A last line without its newline may still be being written (even
+        # with every field present, the last one can be cut short); the offset
+        # stays before it, so the next update reads it once it is terminated
+        logger.info("left %d bytes after the last newline of %s for the next update", len(pending), csv_path)
+    return offset
+
+
+def build(csv_path=DEFAULT_CSV_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """Build the cube from every row of `csv_path` and store it"""
+    with open(csv_path, "rb") as f:
+        header_line = f.readline()
+    header = header_line.decode().strip().split(';')
+    cube = RiskCube()
+    offset = _scan(cube, csv_path, len(header_line), header)
+    _record(cube, csv_path, header, offset)
+    save(cube, cache_dir)
+    return cube
+
+
+def _record(cube, csv_path, header, offset):
+    st = os.stat(csv_path)
+    with open(csv_path, "rb") as f:
+        tail = _tail_digest(f, offset)
+    cube.meta = {
+        "format_version": FORMAT_VERSION,
+        "dimensions": _schema(),
+        "source": {"path": os.path.abspath(csv_path), "header": header, "offset": offset,
+                   "tail_sha256": tail, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "rows": cube.rows,
+                   "skipped": cube.skipped},
+        "updated_at": time.time(),
+    }
+
+
+def update(csv_path=DEFAULT_CSV_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """Bring the stored cube up to date with `csv_path`; returns (cube, rows added, rebuilt)"""
+    cube = load(cache_dir)
+    if cube is None:
+        cube = build(csv_path, cache_dir)
+        return cube, cube.rows, True
+
+    source = cube.meta["source"]
+    st = os.stat(csv_path)
+    if st.st_size == source["size"] and st.st_mtime_ns == source["mtime_ns"]:
+        return cube, 0, False
+    with open(csv_path, "rb") as f:
+        header = f.readline().decode().strip().split(';')
+        appended_only = (st.st_size >= source["offset"] and header == source["header"]
+                         and _tail_digest(f, source["offset"]) == source["tail_sha256"])
+    if not appended_only:
+        cube = build(csv_path, cache_dir)
+        return cube, cube.rows, True
+
+    before = cube.rows
+    offset = _scan(cube, csv_path, source["offset"], header)
+    _record(cube, csv_path, header, offset)
+    save(cube, cache_dir)
+    return cube, cube.rows - before, False
+
+
+_cached = {}
+_lock = threading.Lock()
+
+
+def get_cube(csv_path=DEFAULT_CSV_PATH, cache_dir=DEFAULT_CACHE_DIR):
+    """The up-to-date cube for `csv_path`, shared within the process"""
+    st = os.stat(csv_path)
+    key = (os.path.abspath(csv_path), st.st_size, st.st_mtime_ns)
+    cube = _cached.get(key)
+    if cube is None:
+        with _lock:
+            cube = _cached.get(key)
+            if cube is None:
+                cube = update(csv_path, cache_dir)[0]
+                _cached.clear()
+                _cached[key] = cube
+    return cube
+
+
+# --- CLI ---
+def _parse_where(items):
+    where = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        where[name] = values.split(",")
+    return where
+
+
+def benchmark(csv_path=DEFAULT_CSV_PATH, repeat=20):
+    import pandas as pd
+
+    by, where = ["age_band", "gender"], {"smoke": "Yes", "cholesterol": ["Above Normal", "High"]}
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cube")
+        work_csv = os.path.join(tmp, "cardio.csv")
+        shutil.copyfile(csv_path, work_csv)
+
+        start = time.perf_counter()
+        cube = build(work_csv, cache_dir)
+        build_s = time.perf_counter() - start
+
+        def groupby():
+            df = pd.read_csv(work_csv, sep=';')
+            df = df[(df['smoke'] == 1) & df['cholesterol'].isin([2, 3])]
+            return df.groupby([np.searchsorted(AGE_BAND_EDGES, df['age'] // 365, side="right"),
+                               df['gender']])['cardio'].agg(['count', 'sum'])
+
+        timings = {}
+        for name, fn in (("csv group-by", groupby), ("cube roll-up", lambda: cube.rollup(by, where))):
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                runs.append(time.perf_counter() - start)
+            timings[name] = min(runs)
+        expected = groupby()
+        got = cube.rollup(by, where)
+        parity = (expected['count'].sum() == got['patients'].sum()
+                  and expected['sum'].sum() == got['positives'].sum())
+
+        # Append 1% more labeled rows, then update incrementally vs rebuild
+        with open(work_csv, "rb") as f:
+            f.readline()
+            lines = f.read().splitlines(keepends=True)
+        appended = lines[:max(1, len(lines) // 100)]
+        with open(work_csv, "ab") as f:
+            f.writelines(appended)
+        start = time.perf_counter()
+        cube, added, rebuilt = update(work_csv, cache_dir)
+        update_s = time.perf_counter() - start
+        start = time.perf_counter()
+        rebuilt_cube = build(work_csv, os.path.join(tmp, "rebuilt"))
+        rebuild_s = time.perf_counter() - start
+        same = np.array_equal(cube.counts, rebuilt_cube.counts) and np.array_equal(cube.positives,
+                                                                                    rebuilt_cube.positives)
+
+    print(f"Cube: {cube.counts.size:,} cells over {len(DIMENSIONS)} dimensions, built in {build_s * 1000:.1f} ms")
+    for name, seconds in timings.items():
+        print(f"{name:<14} {seconds * 1000:>9.3f} ms")
+    print(f"Roll-up parity with the group-by: {'OK' if parity else 'MISMATCH'}")
+    print(f"Append {added:,} rows: incremental update {update_s * 1000:.1f} ms "
+          f"({'rebuilt' if rebuilt else 'incremental'}) vs rebuild {rebuild_s * 1000:.1f} ms; "
+          f"{'identical' if same else 'DIFFERENT'} cubes")
+    return 0 if parity and same and not rebuilt else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialized cardio prevalence cube")
+    parser.add_argument("command", choices=["build", "update", "query", "bench"])
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--by", nargs="*", default=[], help=f"dimensions to group by: {', '.join(DIMENSIONS)}")
+    parser.add_argument("--where", nargs="*", default=[], metavar="DIM=LABEL[,LABEL]",
+                        help="slice, e.g. smoke=Yes cholesterol='Above Normal,High'")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        return benchmark(args.csv)
+    if args.command == "build":
+        start = time.perf_counter()
+        cube = build(args.csv, args.cache_dir)
+        print(f"Built {cube.rows:,} rows into {cube.counts.size:,} cells in {time.perf_counter() - start:.2f} s"
+              + (f" ({cube.skipped:,} invalid rows skipped)" if cube.skipped else ""))
+    elif args.command == "update":
+        cube, added, rebuilt = update(args.csv, args.cache_dir)
+        print(f"{'Rebuilt' if rebuilt else 'Added'} {added:,} rows; cube now holds {cube.rows:,}"
+              + (f" ({cube.skipped:,} invalid rows skipped)" if cube.skipped else ""))
+    else:
+        cube = get_cube(args.csv, args.cache_dir)
+        try:
+            frame = cube.rollup(args.by, _parse_where(args.where))
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        print(frame.to_string(index=False, formatters={'rate': "{:.1%}".format}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
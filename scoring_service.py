@@ -0,0 +1,268 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from clinical import FEATURES, calculate_heart_score, get_health_insights
+
+# --- LOCAL SCORING SERVICE ---
+# A dependency-free asyncio HTTP/1.1 server for EHR integrations:
+#   POST /predict      -> {"prediction", "probability"}
+#   POST /heart-score  -> {"score", "bmi"}
+#   POST /insights     -> {"prediction", "probability", "score", "bmi", "insights"}
+#   GET  /stats        -> latency percentiles and batch sizes
+# Bodies are one patient in training encoding (age in days, gender 1/2, ...).
+# Predictions arriving within --max-wait-ms of each other are scored together
+# in one vectorized call of up to --max-batch rows.
+
+REQUIRED = [f for f in FEATURES if f != 'age_y']
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row predictions into batched engine calls"""
+
+    def __init__(self, engine, max_batch=256, max_wait=0.002):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.batch_sizes = deque(maxlen=10_000)
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def predict(self, row):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._score(batch)
+
+    def _score(self, batch):
+        self.batch_sizes.append(len(batch))
+        try:
+            X = np.array([row for row, _ in batch], dtype=np.float32)
+            classes, probabilities, _ = self.engine.evaluate(X)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), cls, proba in zip(batch, classes.tolist(), probabilities.tolist()):
+            if not future.done():
+                future.set_result((cls, proba))
+
+
+class LatencyStats:
+    """Rolling per-endpoint latency window"""
+
+    def __init__(self, window=10_000):
+        self.window = window
+        self.samples = {}
+
+    def record(self, endpoint, seconds):
+        self.samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def summary(self):
+        out = {}
+        for endpoint, samples in self.samples.items():
+            ms = np.array(samples) * 1000
+            out[endpoint] = {
+                "count": len(ms),
+                "p50_ms": float(np.percentile(ms, 50)),
+                "p99_ms": float(np.percentile(ms, 99)),
+                "max_ms": float(ms.max()),
+            }
+        return out
+
+
+class ScoringService:
+    def __init__(self, engine, max_batch=256, max_wait=0.002):
+        self.batcher = MicroBatcher(engine, max_batch, max_wait)
+        self.latency = LatencyStats()
+        self.routes = {
+            "/predict": self.predict,
+            "/heart-score": self.heart_score,
+            "/insights": self.insights,
+        }
+
+    @staticmethod
+    def _patient(body):
+        missing = [f for f in REQUIRED if f not in body]
+        if missing:
+            raise ValueError(f"missing fields: {', '.join(missing)}")
+        # Validated here, before queueing, so a bad field fails only its own
+        # request and never the batch it would have joined
+        patient = {}
+        for f in REQUIRED:
+            value = body[f]
+            if not isinstance(value, (int, float, str)):
+                raise ValueError(f"{f} must be a number")
+            try:
+                value = float(value)
+            except ValueError:
+                raise ValueError(f"{f} must be a number, got {body[f]!r}") from None
+            if not math.isfinite(value):
+                raise ValueError(f"{f} must be finite")
+            # Whole numbers stay ints, so insight texts read "140", not "140.0"
+            patient[f] = int(value) if value.is_integer() else value
+        if patient['height'] <= 0:
+            raise ValueError("height must be positive")
+        patient['age_y'] = int(patient['age'] / 365)
+        return patient
+
+    async def _predict(self, patient):
+        return await self.batcher.predict([patient[f] for f in FEATURES])
+
+    async def predict(self, body):
+        prediction, probability = await self._predict(self._patient(body))
+        return {"prediction": prediction, "probability": probability}
+
+    async def heart_score(self, body):
+        p = self._patient(body)
+        score, bmi = calculate_heart_score(
+            p['age_y'], p['gender'], p['height'], p['weight'], p['ap_hi'], p['ap_lo'],
+            p['cholesterol'], p['gluc'], p['smoke'], p['alco'], p['active']
+        )
+        return {"score": score, "bmi": bmi}
+
+    async def insights(self, body):
+        p = self._patient(body)
+        risk_enhancers = body.get('risk_enhancers', [])
+        if not isinstance(risk_enhancers, list) or not all(isinstance(r, str) for r in risk_enhancers):
+            raise ValueError("risk_enhancers must be a list of strings")
+        prediction, probability = await self._predict(p)
+        score, bmi = calculate_heart_score(
+            p['age_y'], p['gender'], p['height'], p['weight'], p['ap_hi'], p['ap_lo'],
+            p['cholesterol'], p['gluc'], p['smoke'], p['alco'], p['active']
+        )
+        insights = get_health_insights(
+            prediction, p['age_y'], bmi, p['ap_hi'], p['ap_lo'], p['cholesterol'],
+            p['gluc'], p['smoke'], p['alco'], p['active'], risk_enhancers
+        )
+        return {"prediction": prediction, "probability": probability, "score": score,
+                "bmi": bmi, "insights": insights}
+
+    def stats(self):
+        sizes = np.array(self.batcher.batch_sizes) if self.batcher.batch_sizes else np.zeros(1)
+        return {
+            "latency": self.latency.summary(),
+            "batches": {"count": len(self.batcher.batch_sizes), "mean_size": float(sizes.mean()),
+                        "max_size": int(sizes.max())},
+            "max_batch": self.batcher.max_batch,
+            "max_wait_ms": self.batcher.max_wait * 1000,
+        }
+
+    async def dispatch(self, method, path, body):
+        if path == "/stats":
+            return 200, self.stats()
+        handler = self.routes.get(path)
+        if handler is None:
+            return 404, {"error": f"unknown endpoint {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("body must be a JSON object")
+            return 200, await handler(payload)
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                start = time.perf_counter()
+                try:
+                    status, result = await self.dispatch(method, path, body)
+                except Exception as e:
+                    status, result = 500, {"error": str(e)}
+                # Keyed by known routes only, so arbitrary URLs can't grow the stats
+                route = path if path in self.routes or path == "/stats" else "other"
+                self.latency.record(route, time.perf_counter() - start)
+
+                payload = json.dumps(result).encode()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, engine, max_batch, max_wait):
+    service = ScoringService(engine, max_batch, max_wait)
+    service.batcher.start()
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"CardioCare scoring service on http://{host}:{port} "
+          f"(max batch {max_batch}, max wait {max_wait * 1000:.1f} ms)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve CardioCare predictions over HTTP with micro-batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--model", default="heart_model.pkl")
+    parser.add_argument("--max-batch", type=int, default=256, help="largest coalesced model call")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0,
+                        help="how long the first request in a batch waits for company")
+    args = parser.parse_args()
+
+    from tree_engine import get_engine
+
+    engine = get_engine(args.model)
+    try:
+        asyncio.run(serve(args.host, args.port, engine, args.max_batch, args.max_wait_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
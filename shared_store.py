@@ -0,0 +1,317 @@
+import argparse
+import json
+import logging
+import mmap
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+# --- HOST-WIDE SHARED MEMORY STORE ---
+# Each Streamlit replica on a host used to build its own tree arrays and
+# derived dataset columns. A loader process (`python shared_store.py
+# create`) now lays them out once in a named POSIX shared-memory segment:
+# the flattened TreeEngine arrays, the compact cardio columns and the
+# derived age_y / bmi columns. Replicas started with
+# CARDIOCARE_SHARED_STORE=<segment> map it read-only, and get_engine() and
+# load_dataset() serve from it when it was built from the same model file
+# and CSV. Per-replica memory then stays flat as replicas are added.
+#
+# Layout: MAGIC | header length (8 bytes) | JSON header | 64-byte aligned
+# arrays. MAGIC is written last, so a half-written segment is never used.
+
+logger = logging.getLogger("cardiocare.shared_store")
+
+STORE_ENV = "CARDIOCARE_SHARED_STORE"
+DEFAULT_SEGMENT = "cardiocare_store"
+MAGIC = b"CCSHM001"
+ALIGN = 64
+SHM_DIR = "/dev/shm"
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+# --- LOADER ---
+def _collect(model_path, csv_path):
+    from dataset_cache import load_dataset
+    from model_registry import file_digest
+    from tree_engine import get_engine
+
+    engine = get_engine(model_path)
+    ds = load_dataset(csv_path)
+    arrays = {f"tree/{name}": arr for name, arr in engine.state().items()}
+    arrays.update({f"data/{c}": ds[c] for c in ds.columns})
+    # Derived columns every consumer would otherwise recompute per process
+    arrays["data/age_y"] = (ds['age'] // 365).astype(np.int16)
+    arrays["data/bmi"] = (ds['weight'] / (ds['height'].astype(np.float32) / 100) ** 2).astype(np.float32)
+    # The dataset meta lists every column the store serves, derived ones included
+    data_meta = dict(ds.meta, columns={key.split("/", 1)[1]: arr.dtype.str for key, arr in arrays.items()
+                                       if key.startswith("data/")})
+    header = {
+        "model_path": os.path.abspath(model_path),
+        "model_sha256": file_digest(model_path),
+        "feature_names": engine.feature_names,
+        "max_depth": int(engine.max_depth),
+        "data_meta": data_meta,
+        "created_at": time.time(),
+        "arrays": {},
+    }
+    return header, arrays
+
+
+def create(name=DEFAULT_SEGMENT, model_path="heart_model.pkl", csv_path="cardio_train.csv", replace=False):
+    """Build the segment and leave it in place after this process exits; returns its header"""
+    from multiprocessing import resource_tracker, shared_memory
+
+    header, arrays = _collect(model_path, csv_path)
+    offset = 0
+    for key, arr in arrays.items():
+        header["arrays"][key] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset = _align(offset + arr.nbytes)
+    # Array offsets are relative to the data start, which depends on the header size
+    encoded = json.dumps(header).encode()
+    data_start = _align(len(MAGIC) + 8 + len(encoded))
+    size = data_start + offset
+
+    if replace:
+        unlink(name)
+    shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    try:
+        buf = shm.buf
+        buf[len(MAGIC):len(MAGIC) + 8] = len(encoded).to_bytes(8, "little")
+        buf[len(MAGIC) + 8:len(MAGIC) + 8 + len(encoded)] = encoded
+        for key, arr in arrays.items():
+            start = data_start + header["arrays"][key]["offset"]
+            dest = np.ndarray(arr.shape, dtype=arr.dtype, buffer=buf, offset=start)
+            dest[...] = arr
+            del dest
+        buf[:len(MAGIC)] = MAGIC
+        del buf
+    finally:
+        shm.close()
+    # The segment must outlive the loader; replicas keep it mapped, and
+    # `unlink` (or a reboot) removes it
+    resource_tracker.unregister(shm._name, "shared_memory")
+    header["size"] = size
+    return header
+
+
+def unlink(name=DEFAULT_SEGMENT):
+    """Remove the segment; replicas that already mapped it keep their mapping"""
+    from multiprocessing import shared_memory
+
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    shm.close()
+    shm.unlink()  # also drops the tracker registration attaching made
+    return True
+
+
+# --- READERS ---
+class SharedStore:
+    """Read-only view of a store segment"""
+
+    def __init__(self, name=DEFAULT_SEGMENT):
+        self.name = name
+        path = os.path.join(SHM_DIR, name.lstrip("/"))
+        # Mapping the file read-only (instead of SharedMemory) keeps the pages
+        # truly immutable and keeps this process's resource tracker from
+        # unlinking the segment when the replica exits
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            self.inode = os.fstat(fd).st_ino
+            self._mmap = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"shared segment {name!r} is incomplete or not a CardioCare store")
+        length = int.from_bytes(self._mmap[len(MAGIC):len(MAGIC) + 8], "little")
+        self.header = json.loads(self._mmap[len(MAGIC) + 8:len(MAGIC) + 8 + length])
+        data_start = _align(len(MAGIC) + 8 + length)
+        self.arrays = {
+            key: np.ndarray(tuple(spec["shape"]), dtype=np.dtype(spec["dtype"]), buffer=self._mmap,
+                            offset=data_start + spec["offset"])
+            for key, spec in self.header["arrays"].items()
+        }
+
+    def group(self, prefix):
+        return {key.split("/", 1)[1]: arr for key, arr in self.arrays.items() if key.startswith(prefix + "/")}
+
+    def engine(self):
+        from tree_engine import TreeEngine
+
+        return TreeEngine.from_state(self.group("tree"), self.header["feature_names"], self.header["max_depth"])
+
+    def dataset(self):
+        from dataset_cache import ColumnarDataset
+
+        return ColumnarDataset(cache_dir=None, meta=self.header["data_meta"], columns=self.group("data"))
+
+
+_store = None
+_store_lock = threading.Lock()
+_engine = None
+_warned = set()
+
+
+def get_store(refresh=False):
+    """The segment named by CARDIOCARE_SHARED_STORE, attached once per process; None if unset or missing"""
+    global _store, _engine
+    name = os.environ.get(STORE_ENV)
+    if not name:
+        return None
+    with _store_lock:
+        if _store is None or (refresh and _replaced(_store)):
+            try:
+                _store, _engine = SharedStore(name), None
+            except (OSError, ValueError) as e:
+                if name not in _warned:
+                    logger.warning("shared store %r unavailable, loading locally: %s", name, e)
+                    _warned.add(name)
+                _store = None
+        return _store
+
+
+def _replaced(store):
+    try:
+        return os.stat(os.path.join(SHM_DIR, store.name.lstrip("/"))).st_ino != store.inode
+    except FileNotFoundError:
+        return False
+
+
+def _lookup(check):
+    store = get_store()
+    if store is not None and not check(store.header):
+        # The loader may have published a newer segment under the same name
+        store = get_store(refresh=True)
+    return store if store is not None and check(store.header) else None
+
+
+def shared_engine(model_path):
+    """TreeEngine over shared memory if the store holds this exact model file, else None"""
+    global _engine
+    if not os.environ.get(STORE_ENV):
+        return None
+    sha = _cached_digest(model_path)
+    store = _lookup(lambda h: h["model_sha256"] == sha)
+    if store is None:
+        return None
+    with _store_lock:
+        if _engine is None or _engine[0] is not store:
+            _engine = (store, store.engine())
+        return _engine[1]
+
+
+def shared_dataset(csv_path):
+    """ColumnarDataset over shared memory if the store holds this CSV's contents, else None"""
+    if not os.environ.get(STORE_ENV):
+        return None
+    # Matched on content, like the model: a copied or touched CSV still matches
+    sha = _cached_digest(csv_path)
+    store = _lookup(lambda h: h["data_meta"]["source"]["sha256"] == sha)
+    return store.dataset() if store is not None else None
+
+
+_digests = {}
+
+
+def _cached_digest(path):
+    """SHA-256 of `path`, re-hashed only when its mtime or size change"""
+    from model_registry import file_digest
+
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if key not in _digests:
+        _digests[key] = file_digest(path)
+    return _digests[key]
+
+
+# --- BENCHMARK ---
+_REPLICA = """
+import os, sys
+from dataset_cache import load_dataset
+from tree_engine import get_engine
+engine = get_engine({model!r})
+ds = load_dataset({csv!r})
+# What the pages do with the data: derived columns and a full scoring pass
+age_y = ds['age_y'] if 'age_y' in ds else ds['age'] // 365
+bmi = ds['bmi'] if 'bmi' in ds else ds['weight'] / (ds['height'] / 100) ** 2
+X = __import__('numpy').column_stack([ds[f] if f != 'age_y' else age_y for f in engine.feature_names])
+engine.evaluate(X[:1000])
+del X
+fields = dict(l.split(':', 1) for l in open('/proc/self/smaps_rollup').read().splitlines()[1:])
+print(int(fields['Pss'].split()[0]), int(fields['Private_Clean'].split()[0]) + int(fields['Private_Dirty'].split()[0]))
+sys.stdout.flush()
+sys.stdin.read()
+"""
+
+
+def _replicas(n, env, model_path, csv_path):
+    """Start n replica processes together and return their (PSS, USS) in KiB"""
+    code = _REPLICA.format(model=model_path, csv=csv_path)
+    procs = [subprocess.Popen([sys.executable, "-c", code], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                              text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+             for _ in range(n)]
+    readings = [tuple(map(int, p.stdout.readline().split())) for p in procs]
+    for p in procs:
+        p.communicate("")
+    return readings
+
+
+def benchmark(replicas=4, model_path="heart_model.pkl", csv_path="cardio_train.csv", name=DEFAULT_SEGMENT):
+    header = create(name, model_path, csv_path, replace=True)
+    try:
+        print(f"Segment {name}: {header['size'] / 1e6:.1f} MB")
+        print(f"{'mode':<8} {'replicas':>8} {'PSS MiB/replica':>16} {'private MiB/replica':>20}")
+        for mode in ("local", "shared"):
+            env = {k: v for k, v in os.environ.items() if k != STORE_ENV}
+            if mode == "shared":
+                env[STORE_ENV] = name
+            for n in sorted({1, replicas}):
+                readings = _replicas(n, env, model_path, csv_path)
+                pss = sum(r[0] for r in readings) / n / 1024
+                uss = sum(r[1] for r in readings) / n / 1024
+                print(f"{mode:<8} {n:>8} {pss:>16.1f} {uss:>20.1f}")
+    finally:
+        unlink(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host-wide shared-memory store for the model and dataset")
+    parser.add_argument("command", choices=["create", "status", "unlink", "bench"])
+    parser.add_argument("--name", default=os.environ.get(STORE_ENV, DEFAULT_SEGMENT))
+    parser.add_argument("--model", default="heart_model.pkl")
+    parser.add_argument("--data", default="cardio_train.csv")
+    parser.add_argument("--replace", action="store_true", help="replace an existing segment")
+    parser.add_argument("--replicas", type=int, default=4, help="replica processes for bench")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        header = create(args.name, args.model, args.data, args.replace)
+        print(f"Created {args.name}: {header['size'] / 1e6:.1f} MB, model {header['model_sha256'][:12]}, "
+              f"{header['data_meta']['rows']:,} rows. Start replicas with {STORE_ENV}={args.name}")
+    elif args.command == "status":
+        try:
+            store = SharedStore(args.name)
+        except (OSError, ValueError) as e:
+            print(f"{args.name}: unavailable ({e})")
+            return 1
+        age = time.time() - store.header["created_at"]
+        print(f"{args.name}: {len(store._mmap) / 1e6:.1f} MB, model {store.header['model_sha256'][:12]}, "
+              f"{store.header['data_meta']['rows']:,} rows, created {age / 60:.0f} min ago")
+    elif args.command == "unlink":
+        print(f"{args.name}: {'removed' if unlink(args.name) else 'not found'}")
+    else:
+        benchmark(args.replicas, args.model, args.data, args.name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
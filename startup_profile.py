@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# --- COLD-START PROFILER ---
+# Runs a page's first render in a fresh interpreter under `python -X
+# importtime` and reports which modules the page script itself pulled in and
+# what each cost. Streamlit's own import is measured separately, because
+# every page pays it regardless of what the app does.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_MARKER = "--- cardiocare: page script starts ---"
+
+_FIRST_RENDER = """
+import json, sys, time
+start = time.perf_counter()
+import streamlit
+from streamlit import logger
+from streamlit.testing.v1 import AppTest
+logger.set_log_level("error")
+runtime = time.perf_counter() - start
+at = AppTest.from_file({script!r}, default_timeout=120)
+{page_setup}
+sys.stderr.write({marker!r} + "\\n")
+start = time.perf_counter()
+at.run()
+first_render = time.perf_counter() - start
+print(json.dumps({{"runtime_s": runtime, "first_render_s": first_render,
+                  "exceptions": [str(e.value) for e in at.exception]}}))
+"""
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def _run(script, page=None, importtime=False):
+    page_setup = f"at.session_state.page = {page!r}" if page else ""
+    code = _FIRST_RENDER.format(script=os.path.join(HERE, script), page_setup=page_setup, marker=SCRIPT_MARKER)
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    out = subprocess.run(cmd, capture_output=True, text=True, cwd=HERE)
+    if out.returncode != 0:
+        raise RuntimeError(f"first render of {script} failed:\n{out.stderr[-2000:]}")
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    if result["exceptions"]:
+        raise RuntimeError(f"{script} raised: {result['exceptions'][0]}")
+    return result, out.stderr
+
+
+def cold_start(script, page=None):
+    """Seconds for a fresh interpreter's first render of `script`, excluding the Streamlit import"""
+    result, _ = _run(script, page)
+    return result["first_render_s"]
+
+
+def profile(script, page=None):
+    """First-render timings plus the imports triggered by the page script.
+
+    Returns {"runtime_s", "first_render_s", "imports": [{module, self_ms,
+    cumulative_ms}]}, where imports are the top-level imports made while the
+    script ran, slowest first.
+    """
+    result, stderr = _run(script, page, importtime=True)
+    _, _, after = stderr.partition(SCRIPT_MARKER)
+    imports = []
+    for self_us, cumulative_us, indent, module in _IMPORT_LINE.findall(after):
+        # importtime prints children before their parent; depth 1 is what the page asked for
+        if len(indent) // 2 == 0:
+            imports.append({"module": module, "self_ms": int(self_us) / 1000,
+                            "cumulative_ms": int(cumulative_us) / 1000})
+    imports.sort(key=lambda r: -r["cumulative_ms"])
+    return {**result, "imports": imports}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile a CardioCare page's cold start, import by import")
+    parser.add_argument("script", nargs="?", default="app.py", help="page script (default: %(default)s)")
+    parser.add_argument("--page", help="app.py page to open (home, predict, insights, caution, about)")
+    parser.add_argument("--top", type=int, default=15, help="imports to list (default: %(default)s)")
+    args = parser.parse_args()
+
+    report = profile(args.script, args.page)
+    total = sum(r["cumulative_ms"] for r in report["imports"])
+    print(f"{args.script}{' (' + args.page + ')' if args.page else ''}: "
+          f"streamlit runtime import {report['runtime_s'] * 1000:.0f} ms, "
+          f"first render {report['first_render_s'] * 1000:.0f} ms "
+          f"({total:.0f} ms of it in {len(report['imports'])} imports)")
+    print(f"{'module':<40} {'cumulative ms':>14} {'self ms':>8}")
+    for r in report["imports"][:args.top]:
+        print(f"{r['module']:<40} {r['cumulative_ms']:>14.1f} {r['self_ms']:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
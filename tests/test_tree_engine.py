@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tree_engine import BLOCK_ROWS, TreeEngine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(ROOT, "heart_model.pkl")
+DATA_PATH = os.path.join(ROOT, "cardio_train.csv")
+
+
+@pytest.fixture(scope="module")
+def model():
+    from model_registry import get_model
+
+    return get_model(MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def engine(model):
+    return TreeEngine.from_sklearn(model)
+
+
+@pytest.fixture(scope="module")
+def features(model):
+    """The whole dataset in the model's feature order, as the app builds it"""
+    df = pd.read_csv(DATA_PATH, sep=';')
+    df['age_y'] = df['age'] // 365
+    return df[list(model.feature_names_in_)].astype(np.float64)
+
+
+@pytest.fixture(scope="module")
+def boundary_rows(model, features):
+    """A dataset row with each split's feature set exactly on its threshold and one step either side"""
+    tree = model.tree_
+    base = features.iloc[0].to_numpy()
+    rows = []
+    for node in np.flatnonzero(tree.children_left != -1):
+        for value in (np.nextafter(tree.threshold[node], -np.inf), tree.threshold[node],
+                      np.nextafter(tree.threshold[node], np.inf)):
+            row = base.copy()
+            row[tree.feature[node]] = value
+            rows.append(row)
+    return pd.DataFrame(rows, columns=features.columns)
+
+
+def test_dataset_covers_blocked_path(features):
+    assert len(features) > BLOCK_ROWS
+
+
+def test_predict_matches_sklearn_on_dataset(model, engine, features):
+    np.testing.assert_array_equal(engine.predict(features.to_numpy()), model.predict(features))
+
+
+def test_predict_proba_matches_sklearn_on_dataset(model, engine, features):
+    np.testing.assert_array_equal(engine.predict_proba(features.to_numpy()), model.predict_proba(features))
+
+
+def test_apply_matches_sklearn_on_dataset(model, engine, features):
+    np.testing.assert_array_equal(engine.apply(features.to_numpy()), model.apply(features))
+
+
+def test_matches_sklearn_at_split_thresholds(model, engine, boundary_rows):
+    X = boundary_rows.to_numpy()
+    np.testing.assert_array_equal(engine.apply(X), model.apply(boundary_rows))
+    np.testing.assert_array_equal(engine.predict(X), model.predict(boundary_rows))
+    np.testing.assert_array_equal(engine.predict_proba(X), model.predict_proba(boundary_rows))
+
+
+def test_state_round_trip_predicts_the_same(engine, features):
+    X = features.to_numpy()
+    rebuilt = TreeEngine.from_state(engine.state(), engine.feature_names, engine.max_depth)
+    np.testing.assert_array_equal(rebuilt.predict_proba(X), engine.predict_proba(X))
+
+
+def test_rejects_wrong_feature_count(engine):
+    with pytest.raises(ValueError):
+        engine.predict(np.zeros((1, engine.n_features + 1)))
@@ -0,0 +1,210 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+
+import numpy as np
+
+from clinical import FEATURES
+
+# --- TRAINING PIPELINE ---
+# The cleaning and model fit from cardio-checkpoint.ipynb as a reproducible
+# command. Cleaning works on the memory-mapped columns from dataset_cache and
+# builds one boolean mask instead of re-filtering a DataFrame per step; the
+# cleaned rows are cached per input hash, and the fit is skipped when the
+# exported model already came from the same data and parameters.
+
+DEFAULT_DATA_PATH = "cardio_train.csv"
+DEFAULT_MODEL_PATH = "heart_model.pkl"
+CLEAN_CACHE_DIR = os.path.join(".cache", "cleaned")
+CLEANING_VERSION = 1
+
+# Notebook order matters: each IQR fence is computed on the rows that
+# survived the previous filter
+IQR_COLUMNS = ['age_y', 'height', 'weight']
+
+
+def meta_path(model_path):
+    return os.path.splitext(model_path)[0] + ".meta.json"
+
+
+def _iqr_fences(values):
+    q1, q3 = np.quantile(values, [0.25, 0.75])
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def clean_mask(columns):
+    """Boolean mask of the rows the notebook keeps (IQR outliers + BP sanity filters)"""
+    keep = np.ones(len(columns['age']), dtype=bool)
+    for name in IQR_COLUMNS:
+        values = columns[name]
+        lo, hi = _iqr_fences(values[keep])
+        keep &= (values >= lo) & (values <= hi)
+    ap_hi, ap_lo = columns['ap_hi'], columns['ap_lo']
+    keep &= (ap_hi > 0) & (ap_hi < 300)
+    keep &= (ap_lo > 0) & (ap_lo < 200)
+    keep &= ap_hi > ap_lo
+    return keep
+
+
+_clean_lock = threading.Lock()
+
+
+def clean_dataset(data_path=DEFAULT_DATA_PATH, cache_dir=CLEAN_CACHE_DIR):
+    """Return (X float32 in FEATURES order, y int8, data_sha256), cached per input hash"""
+    from dataset_cache import load_dataset
+
+    ds = load_dataset(data_path)
+    target = os.path.join(cache_dir, f"{ds.version}-v{CLEANING_VERSION}")
+    if not os.path.exists(os.path.join(target, "y.npy")):
+        with _clean_lock:
+            # Another thread may have written it while we waited
+            if not os.path.exists(os.path.join(target, "y.npy")):
+                _write_cleaned(ds, target)
+    return np.load(os.path.join(target, "X.npy"), mmap_mode='r'), np.load(os.path.join(target, "y.npy")), ds.version
+
+
+def _write_cleaned(ds, target):
+    columns = {c: ds[c] for c in ds.columns}
+    # Quantiles in float64, like the notebook's pandas columns
+    columns['weight'] = np.asarray(ds['weight'], dtype=np.float64)
+    columns['age_y'] = (ds['age'] / 365).astype(np.int32)
+    keep = clean_mask(columns)
+
+    n_rows = int(keep.sum())
+    # A private directory per writer; the finished one is renamed into place
+    tmp = f"{target}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    X = np.lib.format.open_memmap(os.path.join(tmp, "X.npy"), mode='w+',
+                                  dtype=np.float32, shape=(n_rows, len(FEATURES)))
+    for i, name in enumerate(FEATURES):
+        X[:, i] = columns[name][keep]
+    X.flush()
+    del X
+    np.save(os.path.join(tmp, "y.npy"), np.asarray(ds['cardio'])[keep].astype(np.int8))
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        if not os.path.exists(os.path.join(target, "y.npy")):
+            raise
+        # Another process finished the same version first; keep theirs
+        shutil.rmtree(tmp)
+
+
+def _params_key(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def read_metadata(model_path=DEFAULT_MODEL_PATH):
+    try:
+        with open(meta_path(model_path)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def train(data_path=DEFAULT_DATA_PATH, model_path=DEFAULT_MODEL_PATH, max_depth=5, test_size=0.2,
+          random_state=42, force=False):
+    """Clean, fit and export the decision tree; returns its metadata dict"""
+    from model_registry import file_digest
+
+    params = {"max_depth": max_depth, "test_size": test_size, "random_state": random_state,
+              "cleaning_version": CLEANING_VERSION}
+
+    start = time.perf_counter()
+    X, y, data_sha = clean_dataset(data_path)
+    clean_seconds = time.perf_counter() - start
+
+    meta = read_metadata(model_path)
+    if (not force and meta is not None and os.path.exists(model_path)
+            and meta.get("data_sha256") == data_sha and meta.get("params_key") == _params_key(params)
+            and meta.get("model_sha256") == file_digest(model_path)):
+        meta["cached"] = True
+        return meta
+
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.tree import DecisionTreeClassifier
+
+    # Same split and estimator as the notebook; a DataFrame keeps feature_names_in_
+    import pandas as pd
+
+    frame = pd.DataFrame(np.asarray(X), columns=FEATURES, copy=False)
+    X_train, X_test, y_train, y_test = train_test_split(frame, y, test_size=test_size, random_state=random_state)
+
+    fit_start = time.perf_counter()
+    model = DecisionTreeClassifier(max_depth=max_depth, random_state=random_state)
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - fit_start
+
+    tmp_path = model_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(model, f)
+    os.replace(tmp_path, model_path)
+
+    import sklearn
+
+    meta = {
+        "model_path": os.path.basename(model_path),
+        "model_sha256": file_digest(model_path),
+        "estimator": type(model).__name__,
+        "params": params,
+        "params_key": _params_key(params),
+        "features": FEATURES,
+        "classes": [int(c) for c in model.classes_],
+        "data_path": os.path.basename(data_path),
+        "data_sha256": data_sha,
+        "rows_clean": int(len(y)),
+        "rows_train": int(len(y_train)),
+        "rows_test": int(len(y_test)),
+        "train_accuracy": float(accuracy_score(y_train, model.predict(X_train))),
+        "test_accuracy": float(accuracy_score(y_test, model.predict(X_test))),
+        "clean_seconds": clean_seconds,
+        "fit_seconds": fit_seconds,
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sklearn_version": sklearn.__version__,
+        "cached": False,
+    }
+    with open(meta_path(model_path), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean cardio_train.csv and fit the CardioCare decision tree")
+    parser.add_argument("--data", default=DEFAULT_DATA_PATH)
+    parser.add_argument("--output", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--max-depth", type=int, default=5)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="refit even if inputs are unchanged")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    meta = train(args.data, args.output, args.max_depth, args.test_size, args.random_state, args.force)
+    if meta["cached"]:
+        print(f"{args.output} is up to date with {args.data} ({time.perf_counter() - start:.2f} s)")
+        return 0
+
+    # Keep the sklearn-free scorer and the safe artifact in step with the new pickle
+    from model_artifact import DEFAULT_ARTIFACT_PATH, convert
+    from tree_compiler import DEFAULT_OUTPUT_PATH, build
+    if os.path.abspath(args.output) == os.path.abspath(DEFAULT_MODEL_PATH):
+        build(args.output, DEFAULT_OUTPUT_PATH)
+        convert(args.output, DEFAULT_ARTIFACT_PATH)
+
+    print(f"Trained on {meta['rows_train']:,} rows ({meta['rows_clean']:,} after cleaning) "
+          f"in {meta['fit_seconds']:.2f} s")
+    print(f"Accuracy: train {meta['train_accuracy']:.4f}, test {meta['test_accuracy']:.4f}")
+    print(f"Wrote {args.output} and {meta_path(args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
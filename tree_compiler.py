@@ -0,0 +1,217 @@
+import argparse
+import importlib.machinery
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+
+from lazy_imports import lazy_import
+
+# --- DECISION TREE TO PYTHON COMPILER ---
+# Turns heart_model.pkl into a plain module of nested comparisons so the
+# interactive pages can score one patient without importing sklearn.
+
+DEFAULT_MODEL_PATH = "heart_model.pkl"
+DEFAULT_OUTPUT_PATH = "heart_model_compiled.py"
+
+# Only compiling needs NumPy; serving the generated module does not
+np = lazy_import("numpy")
+
+HEADER = '''\
+# Generated by tree_compiler.py from {model_name} - do not edit by hand.
+# Regenerate with: python tree_compiler.py
+
+MODEL_SHA256 = "{sha256}"
+FEATURES = {features!r}
+CLASSES = {classes!r}
+
+
+def predict_leaf(p):
+    """Return (class, probability of class 1, leaf id) for one patient dict"""
+'''
+
+FOOTER = '''
+
+def predict(p):
+    return predict_leaf(p)[0]
+
+
+def predict_proba(p):
+    return predict_leaf(p)[1]
+'''
+
+
+def decision_bound(threshold):
+    """Largest float64 `b` such that `x <= b` matches sklearn's float32 split.
+
+    sklearn rounds inputs to float32 before testing `x <= threshold`, so the
+    real cut sits halfway between the largest float32 at or below the threshold
+    and the next float32 up; ties round to the even one of the two.
+    """
+    lo = np.float32(threshold)
+    if float(lo) > threshold:
+        lo = np.nextafter(lo, np.float32(-np.inf))
+    hi = np.nextafter(lo, np.float32(np.inf))
+    mid = (float(lo) + float(hi)) / 2
+    lo_is_even = int(np.array(lo).view(np.uint32)) % 2 == 0
+    return mid if lo_is_even else float(np.nextafter(mid, -np.inf))
+
+
+def _emit(engine, node, depth, lines):
+    indent = "    " * (depth + 1)
+    if engine.left[node] == node:
+        cls = engine.leaf_class[node].item()
+        proba = float(engine.proba[node, -1])
+        lines.append(f"{indent}return {cls!r}, {proba!r}, {node}")
+        return
+    name = engine.feature_names[engine.feature[node]]
+    bound = decision_bound(engine.threshold[node])
+    lines.append(f"{indent}if p[{name!r}] <= {bound!r}:")
+    _emit(engine, engine.left[node], depth + 1, lines)
+    lines.append(f"{indent}else:")
+    _emit(engine, engine.right[node], depth + 1, lines)
+
+
+def compile_model(model, model_name, sha256):
+    """Return the source of a standalone module that scores one patient dict"""
+    from tree_engine import TreeEngine
+
+    engine = TreeEngine.from_sklearn(model)
+    if engine.feature_names is None:
+        raise ValueError("Model was fitted without feature names; cannot key a patient dict")
+    lines = [HEADER.format(
+        model_name=model_name,
+        sha256=sha256,
+        features=[str(f) for f in engine.feature_names],
+        classes=[c.item() for c in engine.classes],
+    )]
+    _emit(engine, 0, 0, lines)
+    return "\n".join(lines) + "\n" + FOOTER
+
+
+def load_compiled(path=DEFAULT_OUTPUT_PATH):
+    """Import a generated module from `path` without touching sys.path"""
+    loader = importlib.machinery.SourceFileLoader("heart_model_compiled", path)
+    spec = importlib.util.spec_from_file_location("heart_model_compiled", path, loader=loader)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def verify(compiled, model, X):
+    """Return the number of rows where the generated module disagrees with sklearn"""
+    features = compiled.FEATURES
+    expected_cls = model.predict(X)
+    expected_proba = model.predict_proba(X)[:, -1]
+    mismatches = 0
+    for row, cls, proba in zip(X, expected_cls, expected_proba):
+        got_cls, got_proba, _ = compiled.predict_leaf(dict(zip(features, row.tolist())))
+        if got_cls != cls or got_proba != proba:
+            mismatches += 1
+    return mismatches
+
+
+def _boundary_rows(model, base):
+    """Rows probing each split at, just below and just above its cut point"""
+    tree = model.tree_
+    rows = []
+    for node in range(tree.node_count):
+        if tree.children_left[node] == -1:
+            continue
+        bound = decision_bound(tree.threshold[node])
+        for value in (tree.threshold[node], bound, np.nextafter(bound, np.inf), np.nextafter(bound, -np.inf)):
+            row = base.copy()
+            row[tree.feature[node]] = value
+            rows.append(row)
+    return np.array(rows)
+
+
+def is_current(model_path=DEFAULT_MODEL_PATH, output_path=DEFAULT_OUTPUT_PATH):
+    """True when the generated module was built from the current model file"""
+    from model_registry import file_digest
+
+    if not os.path.exists(output_path):
+        return False
+    return load_compiled(output_path).MODEL_SHA256 == file_digest(model_path)
+
+
+def build(model_path=DEFAULT_MODEL_PATH, output_path=DEFAULT_OUTPUT_PATH, data_path=None):
+    """Compile `model_path`, verify it against the pickle and write `output_path`"""
+    from model_registry import file_digest, get_model
+    from tree_engine import _load_features
+
+    model = get_model(model_path)
+    source = compile_model(model, os.path.basename(model_path), file_digest(model_path))
+
+    # A private temp file per build, so concurrent builds never share one
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(output_path) + ".",
+                                    suffix=".tmp", dir=os.path.dirname(output_path) or ".")
+    with os.fdopen(fd, "w") as f:
+        f.write(source)
+    os.chmod(tmp_path, 0o644)  # mkstemp creates it owner-only
+    try:
+        compiled = load_compiled(tmp_path)
+        # Every split is always probed; the dataset rows are an extra check
+        X = np.zeros((1, model.n_features_in_))
+        if data_path is not None:
+            X = _load_features(data_path, model.feature_names_in_)
+        mismatches = verify(compiled, model, np.vstack([X, _boundary_rows(model, X[0])]))
+        if mismatches:
+            raise RuntimeError(f"Compiled tree disagrees with {model_path} on {mismatches} rows")
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+_compiled = {}
+_lock = threading.Lock()
+
+
+def get_compiled(model_path=DEFAULT_MODEL_PATH, output_path=DEFAULT_OUTPUT_PATH):
+    """Return the generated scorer, rebuilding it first if the model file changed.
+
+    When the module is current this neither unpickles the model nor imports
+    sklearn; only a stale module triggers a rebuild through the registry.
+    """
+    from model_registry import file_digest
+
+    st = os.stat(model_path)
+    cached = _compiled.get(output_path)
+    if cached is not None and cached[0] == (st.st_mtime_ns, st.st_size):
+        return cached[1]
+
+    with _lock:
+        cached = _compiled.get(output_path)
+        if cached is not None and cached[0] == (st.st_mtime_ns, st.st_size):
+            return cached[1]
+        module = load_compiled(output_path) if os.path.exists(output_path) else None
+        if module is None or module.MODEL_SHA256 != file_digest(model_path):
+            build(model_path, output_path)
+            module = load_compiled(output_path)
+        _compiled[output_path] = ((st.st_mtime_ns, st.st_size), module)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile heart_model.pkl into a pure-Python scoring module")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH)
+    parser.add_argument("--data", default="cardio_train.csv", help="rows used to verify the generated module")
+    parser.add_argument("--check", action="store_true", help="only report whether the generated module is current")
+    args = parser.parse_args()
+
+    if args.check:
+        current = is_current(args.model, args.output)
+        print(f"{args.output}: {'up to date' if current else 'STALE'}")
+        return 0 if current else 1
+
+    build(args.model, args.output, args.data)
+    print(f"Wrote {args.output} (verified against {args.model} on {args.data})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import argparse
+import time
+
+import numpy as np
+
+# --- VECTORIZED DECISION TREE ENGINE ---
+# Flattens a fitted sklearn DecisionTreeClassifier into contiguous NumPy arrays
+# and walks whole batches one tree level at a time. Leaves point back at
+# themselves, so after max_depth steps every row has settled on its leaf.
+
+TREE_LEAF = -1
+BLOCK_ROWS = 1 << 16
+
+
+class TreeEngine:
+    """Batch evaluator for a flattened decision tree"""
+
+    # Arrays that fully describe a built engine (see state / from_state)
+    STATE_ARRAYS = ("feature", "threshold", "threshold32", "left", "right", "children", "proba", "classes",
+                    "leaf_class")
+
+    def __init__(self, feature, threshold, left, right, proba, classes, feature_names=None, max_depth=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        # Largest float32 not above each float64 threshold: for float32 inputs
+        # `x <= t32` is then exactly `x <= threshold`, without upcasting
+        t32 = self.threshold.astype(np.float32)
+        over = t32.astype(np.float64) > self.threshold
+        t32[over] = np.nextafter(t32[over], np.float32(-np.inf))
+        self.threshold32 = t32
+        # children[2 * node] is the left child, children[2 * node + 1] the right
+        self.children = np.ascontiguousarray(np.stack([self.left, self.right], axis=1).ravel())
+        self.proba = np.ascontiguousarray(proba, dtype=np.float64)
+        self.classes = np.asarray(classes)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.max_depth = max_depth if max_depth is not None else _depth(self.left, self.right)
+        self.leaf_class = self.classes[np.argmax(self.proba, axis=1)]
+        self.n_features = int(self.feature.max()) + 1 if len(self.feature) else 0
+        if self.feature_names is not None:
+            self.n_features = len(self.feature_names)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted DecisionTreeClassifier"""
+        tree = model.tree_
+        n_nodes = tree.node_count
+        nodes = np.arange(n_nodes)
+        is_leaf = tree.children_left == TREE_LEAF
+
+        # Leaves loop onto themselves with a threshold no value can exceed
+        left = np.where(is_leaf, nodes, tree.children_left)
+        right = np.where(is_leaf, nodes, tree.children_right)
+        feature = np.where(is_leaf, 0, tree.feature)
+        threshold = np.where(is_leaf, np.inf, tree.threshold)
+
+        value = tree.value[:, 0, :].astype(np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1.0
+        proba = value / totals
+
+        return cls(
+            feature, threshold, left, right, proba, model.classes_,
+            feature_names=getattr(model, "feature_names_in_", None),
+            max_depth=tree.max_depth,
+        )
+
+    def state(self):
+        """The engine's arrays, in the exact dtypes it evaluates with"""
+        return {name: getattr(self, name) for name in self.STATE_ARRAYS}
+
+    @classmethod
+    def from_state(cls, arrays, feature_names, max_depth):
+        """Rebuild an engine around existing arrays (e.g. shared memory) without copying them"""
+        engine = cls.__new__(cls)
+        for name in cls.STATE_ARRAYS:
+            setattr(engine, name, arrays[name])
+        engine.feature_names = list(feature_names)
+        engine.max_depth = max_depth
+        engine.n_features = len(engine.feature_names)
+        return engine
+
+    def _check(self, X):
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the tree expects {self.n_features}")
+        # sklearn evaluates splits on float32 inputs; match it bit for bit
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def _apply_block(self, X):
+        n, n_features = X.shape
+        node = np.zeros(n, dtype=np.intp)
+        # Row-major flat view: value of row r, feature f lives at r * n_features + f
+        flat = X.ravel()
+        offsets = np.arange(0, n * n_features, n_features, dtype=np.intp)
+        for _ in range(self.max_depth):
+            x = flat.take(self.feature.take(node) + offsets)
+            go_right = x > self.threshold32.take(node)
+            node = self.children.take(2 * node + go_right)
+        return node
+
+    def apply(self, X):
+        """Return the leaf id reached by each row"""
+        X = self._check(X)
+        if X.shape[0] <= BLOCK_ROWS:
+            return self._apply_block(X)
+        out = np.empty(X.shape[0], dtype=np.intp)
+        for start in range(0, X.shape[0], BLOCK_ROWS):
+            stop = start + BLOCK_ROWS
+            out[start:stop] = self._apply_block(X[start:stop])
+        return out
+
+    def predict(self, X):
+        return self.leaf_class[self.apply(X)]
+
+    def predict_proba(self, X):
+        return self.proba[self.apply(X)]
+
+    def evaluate(self, X):
+        """Return (class, positive-class probability, leaf id) for every row"""
+        leaf = self.apply(X)
+        return self.leaf_class[leaf], self.proba[leaf, -1], leaf
+
+
+def _depth(left, right):
+    """Depth of a flattened tree whose leaves point at themselves"""
+    depth = 0
+    frontier = np.array([0])
+    while True:
+        internal = frontier[left[frontier] != frontier]
+        if len(internal) == 0:
+            return depth
+        depth += 1
+        frontier = np.concatenate([left[internal], right[internal]])
+
+
+_engines = {}
+
+
+def get_engine(path="heart_model.pkl"):
+    """Return a TreeEngine for the shared model, rebuilt when the model reloads.
+
+    Safe artifacts (model_artifact.py, *.npz) load directly, without sklearn,
+    and a matching host shared-memory store (shared_store.py) is used as is.
+    """
+    from shared_store import shared_engine
+
+    engine = shared_engine(path)
+    if engine is not None:
+        return engine
+    if path.endswith(".npz"):
+        from model_artifact import get_artifact
+
+        return get_artifact(path)
+
+    from model_registry import get_model
+
+    model = get_model(path)
+    engine = _engines.get(path)
+    if engine is None or engine[0] is not model:
+        engine = (model, TreeEngine.from_sklearn(model))
+        _engines[path] = engine
+    return engine[1]
+
+
+def verify_parity(model, X):
+    """Compare the engine against sklearn; returns the number of mismatching rows"""
+    engine = TreeEngine.from_sklearn(model)
+    X = np.asarray(X, dtype=np.float64)
+    leaf = engine.apply(X)
+    mismatches = int(np.count_nonzero(leaf != model.apply(X)))
+    mismatches += int(np.count_nonzero(engine.predict(X) != model.predict(X)))
+    if not np.array_equal(engine.predict_proba(X), model.predict_proba(X)):
+        mismatches += 1
+    return mismatches
+
+
+def _load_features(csv_path, feature_names):
+    from dataset_cache import load_dataset
+
+    ds = load_dataset(csv_path)
+    columns = {'age_y': ds['age'] // 365}
+    return np.column_stack([columns[f] if f in columns else ds[f] for f in feature_names]).astype(np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify and benchmark the vectorized tree engine")
+    parser.add_argument("--model", default="heart_model.pkl")
+    parser.add_argument("--data", default="cardio_train.csv")
+    parser.add_argument("--rows", type=int, default=5_000_000, help="rows to score in the throughput run")
+    args = parser.parse_args()
+
+    from model_registry import get_model
+
+    model = get_model(args.model)
+    X = _load_features(args.data, model.feature_names_in_)
+
+    # Include values sitting exactly on each split threshold
+    engine = TreeEngine.from_sklearn(model)
+    edges = np.tile(X[:1], (len(engine.threshold), 1))
+    finite = np.isfinite(engine.threshold)
+    edges[finite, engine.feature[finite]] = engine.threshold[finite]
+    mismatches = verify_parity(model, np.vstack([X, edges]))
+    print(f"Parity vs sklearn: {'OK' if mismatches == 0 else f'{mismatches} mismatches'} on {len(X) + len(edges)} rows")
+
+    big = X[np.random.default_rng(0).integers(0, len(X), args.rows)]
+    start = time.perf_counter()
+    engine.evaluate(big)
+    elapsed = time.perf_counter() - start
+    print(f"Engine:  {args.rows / elapsed:,.0f} rows/s ({elapsed:.3f} s for {args.rows:,} rows)")
+
+    start = time.perf_counter()
+    model.predict_proba(big)
+    elapsed = time.perf_counter() - start
+    print(f"sklearn: {args.rows / elapsed:,.0f} rows/s ({elapsed:.3f} s for {args.rows:,} rows)")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())